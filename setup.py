@@ -8,6 +8,7 @@ setup(
     author_email='ilya.muromec@gmail.com',
     packages=[
         'ukurwa4145',
+        'ukurwa4145.bench',
     ],
     test_suite = 'nose.collector',
 )
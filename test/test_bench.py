@@ -0,0 +1,14 @@
+from ukurwa4145.bench import CASES, run, compare
+
+
+def test_run():
+    results = run(['DSTU_163'], number=1, repeat=1)
+    assert sorted(results['DSTU_163']) == sorted(name for name, _ in CASES)
+    assert all(spent > 0 for spent in results['DSTU_163'].values())
+
+
+def test_compare():
+    results = {'DSTU_163': {'sign': 1.2, 'verify': 1.05, 'field.mul': 1.0}}
+    baseline = {'DSTU_163': {'sign': 1.0, 'verify': 1.0}}
+    assert compare(results, baseline, 0.1) == [('DSTU_163', 'sign', 1.0, 1.2)]
+    assert compare(results, {}, 0.1) == []
@@ -0,0 +1,75 @@
+from ukurwa4145 import curve, Priv, Pubkey
+from ukurwa4145.cache import KeyCache, table_size
+from ukurwa4145.math import FixedBase
+
+
+def help_keys(count):
+    return [Priv(0x1234567 + idx) for idx in range(count)]
+
+
+def test_lookup_min_uses():
+    cache = KeyCache(maxsize=4, min_uses=2)
+    with curve('DSTU_163') as domain:
+        point = Priv(0x1234567).pub().point
+
+        assert cache.lookup(domain, point) is None
+        table = cache.lookup(domain, point)
+        assert isinstance(table, FixedBase)
+        assert cache.lookup(domain, point) is table
+
+        assert table.mul(12345) == point * 12345
+        assert cache.stats() == {
+            'hits': 1, 'misses': 2, 'evictions': 0,
+            'size': 1, 'bytes': table_size(table),
+        }
+
+
+def test_lru_eviction():
+    cache = KeyCache(maxsize=2, min_uses=1)
+    with curve('DSTU_163') as domain:
+        points = [priv.pub().point for priv in help_keys(3)]
+
+        cache.lookup(domain, points[0])
+        cache.lookup(domain, points[1])
+        cache.lookup(domain, points[0])
+        cache.lookup(domain, points[2])
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert KeyCache.key(domain, points[0]) in cache
+        assert KeyCache.key(domain, points[1]) not in cache
+
+
+def test_memory_ceiling():
+    with curve('DSTU_163') as domain:
+        point = Priv(0x1234567).pub().point
+        size = table_size(FixedBase(point, domain.order.bit_length()))
+
+        cache = KeyCache(maxsize=10, max_bytes=size * 2 + 1, min_uses=1)
+        for priv in help_keys(3):
+            cache.lookup(domain, priv.pub().point)
+
+        assert len(cache) == 2
+        assert cache.nbytes <= cache.max_bytes
+
+        tiny = KeyCache(max_bytes=size - 1, min_uses=1)
+        assert tiny.lookup(domain, point) is not None
+        assert len(tiny) == 0
+
+
+def test_verify_with_cache():
+    cache = KeyCache(min_uses=1)
+    Pubkey.key_cache = cache
+    try:
+        with curve('DSTU_257') as domain:
+            priv, pub = Priv.generate()
+            hv = 0xFEFEFEFEFEFDEADF0
+            s, r = priv.sign(value_hash=hv)
+
+            assert pub.verify(value_hash=hv, s=s, r=r)
+            assert pub.verify(value_hash=hv, s=s, r=r)
+            assert not pub._help_verify(hv + 1, s, r, domain=domain)
+            assert cache.hits == 2
+            assert cache.misses == 1
+    finally:
+        Pubkey.key_cache = None
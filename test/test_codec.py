@@ -0,0 +1,91 @@
+from io import BytesIO
+import mmap
+import tempfile
+
+from ukurwa4145 import Point, on_curve
+from ukurwa4145.codec import encode, decode, decode_many, DecodeCache, int_to_bytes
+
+# Compressed DSTU_431 key from certificate, little-endian
+CZO_KEY = bytearray([0xb6, 0x1b, 0xf9, 0xbd, 0x4b, 0x62, 0xca, 0xab, 0x2c, 0x39, 0x50, 0xf5, 0xc5, 0x1d, 0x5f, 0xa8, 0xd, 0x70, 0x7e, 0x0, 0x7b, 0x52, 0x5b, 0x70, 0x67, 0x67, 0xdc, 0xe5, 0xcd, 0x1b, 0xaf, 0x6e, 0x27, 0x68, 0xda, 0xd0, 0xc6, 0xa8, 0x4f, 0xc2, 0x2f, 0x99, 0x5, 0x1d, 0x91, 0x34, 0x35, 0xf4, 0xeb, 0x1e, 0xb1, 0x9a, 0xd5, 0x44])
+CZO_X = 0x44d59ab11eebf43534911d05992fc24fa8c6d0da68276eaf1bcde5dc6767705b527b007e700da85f1dc5f550392cabca624bbdf91bb7
+CZO_Y = 0x6edb5b3e38bf271233378ac0fe3990289007928f56beb38a4f63843b9995afdd88a09c7da6935a4b43b0afde65a4ca9c159d72ed5275
+
+
+@on_curve('DSTU_431')
+def test_decode_compressed(domain):
+    point = decode(CZO_KEY)
+    assert point == Point(CZO_X, CZO_Y)
+    assert encode(point) == bytes(CZO_KEY)
+    assert decode(memoryview(bytes(CZO_KEY))) == point
+    assert Point.decode(bytes(CZO_KEY).encode('hex')) == point
+
+
+@on_curve('DSTU_257')
+def test_roundtrip(domain):
+    points = [domain.base * idx for idx in range(1, 6)]
+    for point in points:
+        assert decode(encode(point)) == point
+        assert decode(encode(point, compressed=False)) == point
+
+    try:
+        decode('\x04\x00')
+    except ValueError:
+        pass
+    else:
+        assert False, "Bad encoding accepted"
+
+
+@on_curve('DSTU_163')
+def test_decode_many(domain):
+    points = [domain.base * idx for idx in range(1, 12)]
+    data = b''.join(encode(point) for point in points)
+
+    assert list(decode_many(data, batch=4)) == points
+    assert list(decode_many(BytesIO(data), batch=5)) == points
+    assert list(decode_many(memoryview(data))) == points
+
+    raw = [encode(point, compressed=False) for point in points]
+    assert list(decode_many(raw)) == points
+    assert list(decode_many(b''.join(raw), size=len(raw[0]))) == points
+
+    with tempfile.TemporaryFile() as fobj:
+        fobj.write(data)
+        fobj.flush()
+        mapped = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        assert list(decode_many(mapped, batch=3)) == points
+        mapped.close()
+
+    cache = DecodeCache(maxsize=8)
+    assert list(decode_many(data * 2, batch=4, cache=cache)) == points * 2
+    assert len(cache) == 8
+
+    cache = DecodeCache()
+    assert list(decode_many(data * 2, batch=4, cache=cache)) == points * 2
+    assert cache.hits == len(points)
+    assert list(decode_many(data * 2, batch=100, cache=cache)) == points * 2
+    assert cache.hits == len(points) * 2
+
+
+@on_curve('DSTU_163')
+def test_decode_many_bad_record(domain):
+    points = [domain.base * idx for idx in range(1, 8)]
+    bad_x = 2
+    while True:
+        try:
+            Point.expand(bad_x)
+        except ValueError:
+            break
+        bad_x += 2
+
+    records = [encode(point) for point in points]
+    records[5] = int_to_bytes(bad_x, len(records[0]), little=True)
+    seen = []
+    try:
+        for point in decode_many(b''.join(records), batch=4):
+            seen.append(point)
+    except ValueError as e:
+        assert 'record 5' in str(e)
+    else:
+        assert False, "Bad point accepted"
+
+    assert seen == points[:5]
@@ -0,0 +1,33 @@
+from ukurwa4145.context import StandardDomain
+from ukurwa4145.counters import Counters
+from ukurwa4145.math import FieldEngine, Point
+
+
+def test_counters():
+    domain = StandardDomain.resolve('DSTU_257')()
+    priv, pub = domain.generate()
+    s, r = domain.sign(priv, 0x1234567)
+    mul = FieldEngine.__dict__['mul']
+
+    seen = []
+    with Counters(hook=lambda operation, stats: seen.append(operation)) as counters:
+        domain.verify(pub, 0x1234567, s, r)
+        domain.sign(priv, 0x1234567)
+        domain.field.inv(5)
+
+    assert FieldEngine.__dict__['mul'] is mul
+    assert domain.field.mod.__name__ == 'reduce'
+
+    stats = counters.as_dict()
+    assert seen == ['verify', 'sign']
+    assert stats['verify']['verify']['calls'] == 1
+    assert stats['verify']['point.double']['calls'] > 200
+    assert stats['verify']['field.mul']['calls'] > stats['verify']['point.double']['calls']
+    assert stats['verify']['field.mod']['calls'] > stats['verify']['field.mul']['calls']
+    assert stats['verify']['field.inv']['calls'] >= 1
+    assert stats['sign']['sign.attempt']['calls'] >= 1
+    assert stats['other']['field.inv']['calls'] == 1
+    assert set(stats['other']) <= set(['field.inv', 'field.mod'])
+
+    assert Counters.installed is None
+    assert Point.__dict__['__mul__'] is Point.__dict__['mul']
@@ -30,6 +30,10 @@ def test_zz(domain):
     assert KA == KB
     assert ZZ == expectZZ
 
+    assert privA.agree(pubB) == expectZZ
+    assert privB.agree(pubA) == expectZZ
+    assert privA.agree(pubB, cofactor=False) == (pointQB * dA).x.v
+
 
 @on_curve('DSTU_431')
 def test_zz_431(domain):
@@ -59,3 +63,37 @@ def test_zz_431(domain):
     assert KA == KB
     assert ZZ == expectZZ
 
+    assert privA.agree(pubB) == expectZZ
+    assert privB.agree(pubA) == expectZZ
+
+
+@on_curve('DSTU_257')
+def test_mul_x(domain):
+    point = domain.base * 0x1234567
+    for param_n in (1, 2, 3, 0x10001, -5, domain.order - 1):
+        assert point.mul_x(param_n) == (point * param_n).x.v
+
+    assert point.mul_x(0) is None
+    assert point.mul_x(domain.order) is None
+    assert Point(0, 0).mul_x(5) is None
+
+
+def test_explicit_domain():
+    from ukurwa4145.context import StandardDomain, ldata
+
+    assert not hasattr(ldata, 'curve_domain')
+    domains = [StandardDomain.resolve(name)() for name in ('DSTU_163', 'DSTU_257')]
+    keys = [domain.generate() for domain in domains]
+
+    for idx in range(3):
+        for domain, (priv, pub) in zip(domains, keys):
+            value_hash = 0x1234567 + idx
+            s, r = domain.sign(priv, value_hash)
+            assert domain.verify(pub, value_hash, s, r)
+            assert domain.pub(priv) == pub
+            assert domain.verify_many([(pub, value_hash, s, r)])
+
+    (priv_a, pub_a), _ = keys
+    priv_b, pub_b = domains[0].generate()
+    domain = domains[0]
+    assert domain.agree(priv_a, pub_b) == domain.agree(priv_b, pub_a)
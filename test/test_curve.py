@@ -1,5 +1,9 @@
 import re
-from ukurwa4145 import curve, Point, Priv, Pubkey, on_curve, Field
+from ukurwa4145 import curve, Point, Priv, Pubkey, on_curve, Field, verify_many
+from ukurwa4145 import crypto
+from ukurwa4145.crypto import BatchSignatureError
+from ukurwa4145.math import ProjPoint, OddMultiples, FieldEngine, wnaf
+from ukurwa4145.context import StandardDomain
 import random
 
 PUB_KEY = """
@@ -21,11 +25,91 @@ def test_on_curve(domain):
     point_INV = Point(1, 1)
     assert point_INV not in domain.curve
 
+def test_shared_domain():
+    with curve('DSTU_257') as first:
+        pass
+
+    with curve('DSTU_257') as second:
+        assert second is first
+        assert second is StandardDomain.get('DSTU_257')
+        assert second.base is first.base
+
+    assert StandardDomain.get('DSTU_163') is not first
+    writes = (
+        lambda: setattr(first, 'order', 1),
+        lambda: setattr(first.base.x, 'v', 5),
+        lambda: setattr(first.base, 'yv', 5),
+        lambda: setattr(first.curve, 'field_b', 7),
+        lambda: setattr(first.field, 'modulus', 3),
+    )
+    for write in writes:
+        try:
+            write()
+        except AttributeError:
+            pass
+        else:
+            assert False, "Shared domain changed"
+
+    assert first.base == Point(first.BASE_X, first.BASE_Y, curve=first.curve)
+    assert first.curve.field_b == first.PARAM_B
+    assert first.base in first.curve
+
 @on_curve('DSTU_257')
 def test_trace(domain):
     trace = Field.trace(0x2A29EF207D0E9B6C55CD260B306C7E007AC491CA1B10C62334A9E8DCD8D20FB6)
     assert trace == 1
 
+def trace_bitwise(field, val):
+    ret = val
+    for idx in range(1, field.param_m):
+        val = field.sqr(val)
+        ret ^= val
+
+    return ret
+
+def help_squad(field, values):
+    for val in values:
+        if field.trace(val):
+            try:
+                field.squad(val)
+            except ValueError:
+                pass
+            else:
+                assert False, "Solved equation with no solution"
+            continue
+
+        val_z = field.squad(val)
+        assert field.sqr(val_z) ^ val_z == val
+
+def test_squad():
+    rnd = random.Random(4145)
+    for name in ('DSTU_163', 'DSTU_257', 'DSTU_431'):
+        field = StandardDomain.resolve(name)().field
+        values = [rnd.getrandbits(field.param_m) for _ in range(20)]
+        help_squad(field, values)
+
+        val = values[0] ^ field.trace(values[0])
+        assert field.squad_odd(val) in (field.squad(val), field.squad(val) ^ 1)
+
+def test_squad_even():
+    field = FieldEngine(8, [4, 3, 1, 0], 255)
+    help_squad(field, range(256))
+
+    field = FieldEngine(128, [7, 2, 1, 0], 1 << 127)
+    rnd = random.Random(128)
+    help_squad(field, [rnd.getrandbits(128) for _ in range(20)])
+
+def test_trace_mask():
+    rnd = random.Random(4145)
+    for name in ('DSTU_163', 'DSTU_257', 'DSTU_431'):
+        field = StandardDomain.resolve(name)().field
+        for idx in range(field.param_m):
+            assert field.trace(1 << idx) == trace_bitwise(field, 1 << idx)
+
+        for _ in range(10):
+            val = rnd.getrandbits(field.param_m)
+            assert field.trace(val) == trace_bitwise(field, val)
+
 @on_curve('DSTU_257')
 def test_mod(domain):
     moded = Field.mod(0xaff3ee09cb429284985849e20de5742e194aa631490f62ba88702505629a65890)
@@ -39,11 +123,161 @@ def test_mul(domain):
     )
     assert mul == 0xbeb7d8390bb24fcf6882086cddd4ebe5270c1ed345bc516b40efb92b44530d5f
 
+def mod_bitwise(val, modulus):
+    bitm_l = modulus.bit_length()
+    while val.bit_length() >= bitm_l:
+        val = val ^ (modulus << (val.bit_length() - bitm_l))
+
+    return val
+
+def help_mod_sparse(domain):
+    assert domain.field.reduce is not None
+
+    rnd = random.Random(domain.param_m)
+    for size in (domain.param_m, domain.param_m + 1, domain.param_m * 2 - 1, domain.param_m * 3):
+        val = rnd.getrandbits(size)
+        assert Field.mod(val) == mod_bitwise(val, domain.modulus)
+
+    assert Field.mod(domain.modulus) == 0
+
+@on_curve('DSTU_163')
+def test_mod_sparse_163(domain):
+    help_mod_sparse(domain)
+
+@on_curve('DSTU_257')
+def test_mod_sparse_257(domain):
+    help_mod_sparse(domain)
+
+@on_curve('DSTU_431')
+def test_mod_sparse_431(domain):
+    help_mod_sparse(domain)
+
+def test_comp_reduce_dense():
+    assert Field.comp_reduce(7, 7, 5, 0) is None
+    assert Field.comp_reduce(7, 7, 1) is None
+    assert Field.comp_reduce(7, 7, 1, 0) is not None
+
+def mul_bitwise(val_a, val_b):
+    val_c = 0
+    for j in xrange(val_a.bit_length()):
+        if val_a & (1<<j):
+            val_c = val_c ^ val_b
+        val_b = val_b << 1
+
+    return Field.mod(val_c)
+
+def help_mul_comb(domain):
+    rnd = random.Random(domain.param_m)
+    for _ in range(50):
+        val_a = rnd.getrandbits(domain.param_m)
+        val_b = rnd.getrandbits(domain.param_m)
+        assert Field.mul(val_a, val_b) == mul_bitwise(val_a, val_b)
+
+    top = (1 << domain.param_m) - 1
+    assert Field.mul(top, top) == mul_bitwise(top, top)
+    assert Field.mul(0, top) == 0
+    assert Field.mul(top, 0) == 0
+    assert Field.mul(1, top) == Field.mod(top)
+
+@on_curve('DSTU_163')
+def test_mul_comb_163(domain):
+    help_mul_comb(domain)
+
+@on_curve('DSTU_257')
+def test_mul_comb_257(domain):
+    help_mul_comb(domain)
+
+@on_curve('DSTU_431')
+def test_mul_comb_431(domain):
+    help_mul_comb(domain)
+
+def help_sqr(domain):
+    rnd = random.Random(domain.param_m)
+    for _ in range(50):
+        val = rnd.getrandbits(domain.param_m)
+        assert Field.sqr(val) == Field.mul(val, val)
+
+    assert Field.sqr(0) == 0
+    assert Field.sqr(1) == 1
+    assert Field.sqr_n(val, 0) == val
+    assert Field.sqr_n(val, 3) == Field.sqr(Field.sqr(Field.sqr(val)))
+
+    top = (1 << domain.param_m) - 1
+    assert Field.sqr(top) == Field.mul(top, top)
+
+@on_curve('DSTU_163')
+def test_sqr_163(domain):
+    help_sqr(domain)
+
+@on_curve('DSTU_257')
+def test_sqr_257(domain):
+    help_sqr(domain)
+
+@on_curve('DSTU_431')
+def test_sqr_431(domain):
+    help_sqr(domain)
+
 @on_curve('DSTU_257')
 def test_inv(domain):
     neg = Field.inv(0xaff3ee09cb429284985849e20de5742e194aa631490f62ba88702505629a65890)
     assert neg == 0xf5ae84d0c4dc2e7e89c670fb2083d124be50b413efb6863705bd63a5168352e0
 
+def test_inv_itoh():
+    rnd = random.Random(4145)
+    for name in ('DSTU_163', 'DSTU_257', 'DSTU_431'):
+        domain = StandardDomain.resolve(name)()
+        field = FieldEngine(domain.param_m, domain.PARAM_K, domain.order, inv='itoh')
+        assert field.inv == field.inv_itoh
+        for _ in range(5):
+            val = rnd.getrandbits(domain.param_m)
+            assert field.inv(val) == domain.field.inv(val)
+            assert field.mul(field.inv(val), val) == 1
+
+    field = FieldEngine(8, [4, 3, 1, 0], 255, inv='itoh')
+    for val in range(1, 256):
+        assert field.mul(field.inv(val), val) == 1
+
+    for method in FieldEngine.INV_METHODS:
+        field = FieldEngine(8, [4, 3, 1, 0], 255, inv=method)
+        for zero in (0, field.modulus):
+            try:
+                field.inv(zero)
+            except ValueError:
+                pass
+            else:
+                assert False, "Zero inverted by " + method
+
+    try:
+        FieldEngine(8, [4, 3, 1, 0], 255, inv='fermat')
+    except ValueError:
+        pass
+    else:
+        assert False, "Unknown inversion accepted"
+
+@on_curve('DSTU_257')
+def test_batch_inv(domain):
+    rnd = random.Random(10)
+    values = [rnd.getrandbits(domain.param_m) for _ in range(5)]
+    values.insert(2, 0)
+    assert Field.batch_inv(values) == [Field.inv(val) if val else 0 for val in values]
+    assert Field.batch_inv([values[0]]) == [Field.inv(values[0])]
+    assert Field.batch_inv([0, 0]) == [0, 0]
+    assert Field.batch_inv([]) == []
+
+@on_curve('DSTU_163')
+def test_batch_to_affine(domain):
+    proj_G = ProjPoint.from_affine(domain.base)
+    points = [proj_G.double(), proj_G, ProjPoint(1, 0, 0), proj_G.double().double()]
+    assert ProjPoint.batch_to_affine(points) == [point.to_affine() for point in points]
+
+@on_curve('DSTU_431')
+def test_expand_many(domain):
+    points = [domain.base * idx for idx in (1, 2, 3, 4)]
+    values = [point.compress() for point in points] + [0]
+    expanded = Point.expand_many(values)
+    assert expanded == [Point.expand(val) for val in values]
+    assert [Point(x, y) for x, y in expanded[:4]] == points
+
 @on_curve('DSTU_257')
 def test_expand(domain):
     x, y  = Point.expand(0)
@@ -130,6 +364,142 @@ def test_point_mul(domain):
         0xa8624188d9f4ab0afafbde6230cd8cf7c28b38f42fcbb4021ff0c0244a5ddbbd
     )
 
+def help_proj(domain):
+    point_P = domain.base + domain.base + domain.base
+    point_Q = point_P + domain.base
+
+    proj_P = ProjPoint.from_affine(point_P)
+    proj_2Q = ProjPoint.from_affine(point_Q).double()
+
+    assert proj_P.double().to_affine() == point_P + point_P
+    assert proj_P.add_mixed(point_Q).to_affine() == point_P + point_Q
+    assert proj_P.add_mixed(point_P).to_affine() == point_P + point_P
+    assert (proj_P.double() + proj_2Q).to_affine() == (point_P + point_P) + (point_Q + point_Q)
+    assert (proj_2Q + proj_2Q).to_affine() == proj_2Q.double().to_affine()
+
+    assert proj_P.add_mixed(point_P.negate()).infinity
+    assert (proj_P + ProjPoint.from_affine(point_P.negate())).infinity
+    assert (proj_P + ProjPoint.from_affine(Point(0, 0))).to_affine() == point_P
+    assert ProjPoint.from_affine(Point(0, 0)).add_mixed(point_P).to_affine() == point_P
+
+    acc = ProjPoint.from_affine(point_P)
+    assert acc.idouble() is acc
+    assert acc.iadd_mixed(point_Q).to_affine() == point_P + point_P + point_Q
+    assert acc.iadd_mixed(Point(0, 0)).to_affine() == point_P + point_P + point_Q
+
+    acc = ProjPoint(1, 0, 0, domain.curve).iadd_mixed(point_P).iadd_mixed(point_P)
+    assert acc.to_affine() == point_P + point_P
+
+@on_curve('DSTU_163')
+def test_proj_163(domain):
+    help_proj(domain)
+
+@on_curve('DSTU_257')
+def test_proj_257(domain):
+    help_proj(domain)
+
+@on_curve('DSTU_257')
+def test_point_coords(domain):
+    point = Point(PUB_X, PUB_Y)
+    assert not hasattr(point, '__dict__')
+    assert (point.xv, point.yv) == (PUB_X, PUB_Y)
+    assert point.x.v == PUB_X
+    assert point.x == Field(PUB_X)
+
+    point.x.v = domain.base.xv
+    point.y = domain.base.y
+    assert point == domain.base
+    assert point.curve is domain.curve
+
+@on_curve('DSTU_257')
+def test_point_mul_edge(domain):
+    point_Q = Point(PUB_X, PUB_Y)
+    assert (point_Q * 0).infinity
+    assert point_Q * 1 == point_Q
+    assert point_Q * 3 == point_Q + point_Q + point_Q
+    assert point_Q * -3 == (point_Q * 3).negate()
+    assert (Point(0, 0) * 5).infinity
+
+def help_fixed_base(domain):
+    rnd = random.Random(domain.param_m)
+    table = domain.base_table
+    for param_n in (1, 2, 15, 16, 17, domain.order - 1, rnd.randint(1, domain.order)):
+        assert table.mul(param_n) == domain.base * param_n
+
+    assert table.mul(0).infinity
+    assert table.mul(domain.order).infinity
+    assert table.mul(-5) == domain.base * -5
+    assert table.mul(domain.order * 16 + 3) == domain.base * 3
+
+@on_curve('DSTU_163')
+def test_fixed_base_163(domain):
+    help_fixed_base(domain)
+
+@on_curve('DSTU_257')
+def test_fixed_base_257(domain):
+    help_fixed_base(domain)
+
+def test_fixed_base_shared():
+    with curve('DSTU_257') as domain:
+        table = domain.base_table
+
+    with curve('DSTU_257') as domain:
+        assert domain.base_table is table
+
+    with curve('DSTU_163') as domain:
+        assert domain.base_table is not table
+
+def help_mul2(domain):
+    rnd = random.Random(domain.param_m)
+    point_Q = domain.base * rnd.randint(1, domain.order)
+    point_G = domain.base
+    for _ in range(3):
+        param_s = rnd.randint(1, domain.order)
+        param_r = rnd.randint(1, domain.order)
+        expect = point_G * param_s + point_Q * param_r
+        assert Point.mul2(param_s, point_G, param_r, point_Q).to_affine() == expect
+
+    assert Point.mul2(7, point_G, 0, point_Q).to_affine() == point_G * 7
+    assert Point.mul2(0, point_G, 0, point_Q).infinity
+    assert Point.mul2(3, point_G, -3, point_G).infinity
+    assert Point.mul2(5, point_G, 0x12345, point_G).to_affine() == point_G * 0x1234a
+    assert Point.mul2(-5, point_G, 3, point_Q).to_affine() == point_G * -5 + point_Q * 3
+
+def test_wnaf():
+    rnd = random.Random(4)
+    for width in (2, 4, 5, 7):
+        for param_n in [0, 1, 7, 255, -300] + [rnd.getrandbits(257) for _ in range(5)]:
+            digits = wnaf(param_n, width)
+            assert sum(digit << pos for pos, digit in enumerate(digits)) == param_n
+            for pos, digit in enumerate(digits):
+                if digit == 0:
+                    continue
+
+                assert digit & 1
+                assert abs(digit) < (1 << (width - 1))
+                assert not any(digits[pos + 1:pos + width])
+
+@on_curve('DSTU_257')
+def test_odd_multiples(domain):
+    point_Q = Point(PUB_X, PUB_Y)
+    table = OddMultiples(point_Q, 4)
+    assert len(table.table) == 4
+    assert table.table[3] == point_Q * 7
+    assert table.mul(0x2A45EAFE4CD469F811737780C57253360FBCC58E134C9A1FDCD10B0E4529A143) == Point(
+        0x8c3d388b1c51116cf0ed041718309b360f775d8df86e9fc141822e79a3b0da8b,
+        0xa8624188d9f4ab0afafbde6230cd8cf7c28b38f42fcbb4021ff0c0244a5ddbbd
+    )
+    assert table.mul(-9) == (point_Q + point_Q * 8).negate()
+    assert Point.mul2(3, domain.base_wnaf, 5, table).to_affine() == domain.base * 3 + point_Q * 5
+
+@on_curve('DSTU_163')
+def test_mul2_163(domain):
+    help_mul2(domain)
+
+@on_curve('DSTU_431')
+def test_mul2_431(domain):
+    help_mul2(domain)
+
 @on_curve('DSTU_257')
 def test_compress(domain):
     pt = Point(0x2A29EF207D0E9B6C55CD260B306C7E007AC491CA1B10C62334A9E8DCD8D20FB7,
@@ -184,6 +554,48 @@ def test_sign():
 
 
 
+def test_verify_many():
+    with curve('DSTU_163') as domain:
+        keys = [Priv.generate(), Priv.generate()]
+        items = []
+        for idx in range(6):
+            priv, pub = keys[idx % 2]
+            hv = random.randint(1, 2**32)
+            s, r = priv.sign(value_hash=hv)
+            items.append((pub, hv, s, r))
+
+        assert verify_many(items)
+        assert keys[0][1].verify_batch([item[1:] for item in items[::2]])
+
+        broken = list(items)
+        pub, hv, s, r = broken[1]
+        broken[1] = (pub, hv + 1, s, r)
+        pub, hv, s, r = broken[4]
+        broken[4] = (keys[1][1], hv, s, r)
+        pub, hv, s, r = broken[5]
+        broken[5] = (pub, hv, 0, r)
+
+        help_verify_many_broken(broken)
+
+        assert verify_many([])
+
+        # every key in batch is hot enough to get fixed-base table
+        threshold, crypto.BATCH_FIXED_KEY = crypto.BATCH_FIXED_KEY, 2
+        try:
+            assert verify_many(items)
+            help_verify_many_broken(broken)
+        finally:
+            crypto.BATCH_FIXED_KEY = threshold
+
+def help_verify_many_broken(broken):
+    try:
+        verify_many(broken)
+    except BatchSignatureError as e:
+        assert e.bad == [1, 4, 5]
+    else:
+        assert False, "Batch with bad signatures verified"
+
+
 def test_priv_pub():
     with curve('DSTU_257') as domain:
         PRIV = 0x2A45EAFE4CD469F811737780C57253360FBCC58E134C9A1FDCD10B0E4529A143
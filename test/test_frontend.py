@@ -0,0 +1,166 @@
+import threading
+
+from ukurwa4145 import curve
+from ukurwa4145.context import StandardDomain
+from ukurwa4145.crypto import SignatureError
+from ukurwa4145.frontend import Frontend, Future, Full, CancelledError, Closed
+
+
+def test_sign_verify():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    hashes = [0x1234567 + idx for idx in range(8)]
+
+    with Frontend(domain, batch_size=4) as front:
+        sigs = [front.sign(priv, value_hash) for value_hash in hashes]
+        sigs = [future.result() for future in sigs]
+
+        futures = [
+            front.verify(pub, value_hash, s, r)
+            for value_hash, (s, r) in zip(hashes, sigs)
+        ]
+        bad = front.verify(pub, hashes[0], *sigs[1])
+
+        assert all(future.result() for future in futures)
+        try:
+            bad.result()
+        except SignatureError:
+            pass
+        else:
+            assert False, "Bad signature accepted"
+
+
+def test_malformed_in_batch():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    s, r = domain.sign(priv, 0x1234567)
+
+    with Frontend(domain, batch_size=8, batch_delay=0.5) as front:
+        good = [front.verify(pub, 0x1234567, s, r) for _ in range(3)]
+        bad = front.verify(pub, None, s, r)
+
+        assert [future.result() for future in good] == [True] * 3
+        try:
+            bad.result()
+        except TypeError:
+            pass
+        else:
+            assert False, "Malformed request accepted"
+
+
+def test_raising_callback_in_batch():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    s, r = domain.sign(priv, 0x1234567)
+
+    def closed_loop(future):
+        raise RuntimeError("Event loop is closed")
+
+    with Frontend(domain, max_inflight=3, batch_size=8, batch_delay=0.5) as front:
+        futures = [front.verify(pub, 0x1234567, s, r) for _ in range(3)]
+        futures[0].add_done_callback(closed_loop)
+        assert [future.result(timeout=10) for future in futures] == [True] * 3
+
+        # Every slot was released.
+        assert front.verify(pub, 0x1234567, s, r, block=False).result(timeout=10)
+
+
+def test_closed():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    s, r = domain.sign(priv, 0x1234567)
+    front = Frontend(domain)
+    front.close()
+    front.close()
+    for submit in (lambda: front.verify(pub, 0x1234567, s, r),
+                   lambda: front.sign(priv, 0x1234567)):
+        try:
+            submit()
+        except Closed:
+            pass
+        else:
+            assert False, "Request accepted after close"
+
+
+def test_executor_error():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    s, r = domain.sign(priv, 0x1234567)
+
+    class Flaky(object):
+        def __init__(self):
+            self.calls = 0
+
+        def apply_async(self, func, args):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("Executor is down")
+
+            return func(*args)
+
+    front = Frontend(domain, executor=Flaky())
+    try:
+        front.verify(pub, 0x1234567, s, r).result(timeout=10)
+    except RuntimeError:
+        pass
+    else:
+        assert False, "Executor error was lost"
+
+    assert front.verify(pub, 0x1234567, s, r).result(timeout=10)
+    front.close()
+
+
+def test_context_domain():
+    with curve('DSTU_257') as domain:
+        priv, pub = domain.generate()
+        front = Frontend()
+        future = front.sign(priv, 0x1234567)
+
+    s, r = future.result()
+    assert front.verify(pub, 0x1234567, s, r, domain=domain).result()
+    front.close()
+
+
+def test_backpressure():
+    gate = threading.Event()
+
+    class Blocked(object):
+        def sign(self, value_hash, domain):
+            gate.wait()
+            return value_hash
+
+    domain = StandardDomain.resolve('DSTU_163')()
+    front = Frontend(domain, max_inflight=2)
+    first = front.sign(Blocked(), 1)
+    second = front.sign(Blocked(), 2)
+    try:
+        front.sign(Blocked(), 3, block=False)
+    except Full:
+        pass
+    else:
+        assert False, "Queue is not bounded"
+
+    assert second.cancel()
+    third = front.sign(Blocked(), 3, block=False)
+    gate.set()
+
+    assert first.result() == 1
+    assert third.result() == 3
+    try:
+        second.result()
+    except CancelledError:
+        pass
+    else:
+        assert False, "Cancelled request was computed"
+
+    front.close()
+
+
+def test_future_callback():
+    seen = []
+    future = Future()
+    future.add_done_callback(seen.append)
+    future.set_result(5)
+    future.add_done_callback(seen.append)
+    assert seen == [future, future]
+    assert not future.cancel()
@@ -0,0 +1,64 @@
+from io import BytesIO
+import mmap
+import random
+import tempfile
+
+from ukurwa4145 import Priv, on_curve
+from ukurwa4145.crypto import SignatureError, value_hash_of
+from ukurwa4145.gost34311 import Gost34311, SBOX_TEST, hash_value
+
+# GOST R 34.11-94 with test parameters
+VECTORS = (
+    ('', 'ce85b99cc46752fffee35cab9a7b0278abb4c2d2055cff685af4912c49490f8d'),
+    ('abc', 'f3134348c44fb1b2a277729e2285ebb5cb5e0f29c975bc753b70497c06a4d51d'),
+    ('message digest', 'ad4434ecb18f2c99b60cbe59ec3d2469582b65273f48de72db2fde16a4889a4d'),
+    ('This is message, length=32 bytes', 'b1c466d37519b82e8319819ff32595e047a28cb6f83eff1c6916a815a637fffa'),
+    ('The quick brown fox jumps over the lazy dog', '77b7fa410c9ac58a25f49bca7d0468c9296529315eaca76bd1a10f376d1f4294'),
+)
+
+
+def test_vectors():
+    for data, expect in VECTORS:
+        assert Gost34311(data, sbox=SBOX_TEST).hexdigest() == expect
+        assert hash_value(bytearray(data), SBOX_TEST).hexdigest() == expect
+
+
+def test_chunks():
+    data = bytes(bytearray(random.Random(34311).getrandbits(8) for _ in range(1000)))
+    expect = Gost34311(data).digest()
+    for step in (1, 7, 31, 32, 33, 100):
+        ctx = Gost34311()
+        for pos in range(0, len(data), step):
+            ctx.update(memoryview(data)[pos:pos + step])
+
+        assert ctx.digest() == expect
+
+    ctx = Gost34311(data[:500])
+    copy = ctx.copy()
+    ctx.update(data[500:])
+    assert ctx.digest() == expect
+    assert copy.update(data[500:]).digest() == expect
+
+    assert hash_value(BytesIO(data)).digest() == expect
+    assert Gost34311().update_from(BytesIO(data), chunk_size=96).digest() == expect
+    with tempfile.TemporaryFile() as fobj:
+        fobj.write(data)
+        fobj.flush()
+        mapped = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        assert hash_value(mapped).digest() == expect
+        mapped.close()
+
+
+@on_curve('DSTU_257')
+def test_sign_value(domain):
+    data = 'Document to sign ' * 100
+    priv, pub = Priv.generate()
+    s, r = priv.sign(value=data)
+    assert pub.verify(value=BytesIO(data), s=s, r=r)
+    assert pub.verify(value_hash=value_hash_of(data), s=s, r=r)
+    try:
+        pub.verify(value=data + '.', s=s, r=r)
+    except SignatureError:
+        pass
+    else:
+        assert False, "Signature of other document accepted"
@@ -0,0 +1,24 @@
+from ukurwa4145.context import StandardDomain
+from ukurwa4145.parallel import Pool
+
+
+def test_pool():
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+    priv_b, pub_b = domain.generate()
+    hashes = [0x1234567 + idx for idx in range(10)]
+
+    with Pool(2, curves=['DSTU_163'], chunksize=3) as pool:
+        sigs = pool.sign('DSTU_163', [(priv, value_hash) for value_hash in hashes])
+        assert len(sigs) == len(hashes)
+
+        jobs = [
+            (pub, value_hash, s, r)
+            for value_hash, (s, r) in zip(hashes, sigs)
+        ]
+        jobs[3] = (pub, hashes[4]) + sigs[3]
+        ok = pool.verify('DSTU_163', jobs)
+        assert ok == [True] * 3 + [False] + [True] * 6
+
+        zz = list(pool.imap_agree('DSTU_163', [(priv, pub_b), (priv_b, pub)]))
+        assert zz == [domain.agree(priv, pub_b)] * 2
@@ -0,0 +1,84 @@
+from io import BytesIO
+import mmap
+import tempfile
+
+from ukurwa4145 import Priv, on_curve
+from ukurwa4145.crypto import SignatureError
+from ukurwa4145.signature import (
+    encode, decode, parse_many, signature_size, der_length, der_header,
+)
+
+
+def test_der_length():
+    for size in (0, 1, 0x7F, 0x80, 0xFF, 0x100, 0x12345):
+        data = 'x' * 3 + '\x04' + der_length(size)
+        assert der_header(data, 3)[::2] == (0x04, size)
+
+
+@on_curve('DSTU_257')
+def test_roundtrip(domain):
+    size = signature_size(domain)
+    for s, r in ((1, 2), (domain.order - 1, domain.order - 2)):
+        raw = encode(s, r)
+        assert len(raw) == size
+        assert decode(raw) == (s, r)
+        assert decode(bytearray(raw)) == (s, r)
+        assert decode(memoryview(raw)) == (s, r)
+
+        der = encode(s, r, der=True)
+        assert der == '\x04' + chr(size) + raw
+        assert decode(der) == (s, r)
+        assert decode('\x03' + chr(size + 3) + '\x00' + der) == (s, r)
+
+    assert encode(1, 2)[:2] == '\x02\x00'
+    assert encode(1, 2)[size // 2] == '\x01'
+    for bad in ('\x04\x05abc', '\x05\x02ab', '\x04\x03abc'):
+        try:
+            decode(bad)
+        except ValueError:
+            pass
+        else:
+            assert False, "Bad encoding accepted"
+
+
+@on_curve('DSTU_163')
+def test_parse_many(domain):
+    sigs = [(idx * 7919, idx * 104729) for idx in range(1, 300)]
+    raw = ''.join(encode(s, r) for s, r in sigs)
+    der = ''.join(encode(s, r, der=True) for s, r in sigs)
+
+    assert list(parse_many(der)) == sigs
+    assert list(parse_many(bytearray(der))) == sigs
+    assert list(parse_many(raw, der=False)) == sigs
+    assert list(parse_many(BytesIO(der), chunk_size=100)) == sigs
+    assert list(parse_many(BytesIO(raw), der=False, chunk_size=100)) == sigs
+    assert list(parse_many([encode(s, r) for s, r in sigs])) == sigs
+
+    with tempfile.TemporaryFile() as fobj:
+        fobj.write(der)
+        fobj.flush()
+        mapped = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        assert list(parse_many(mapped)) == sigs
+        mapped.close()
+
+    try:
+        list(parse_many(BytesIO(der[:-1]), chunk_size=100))
+    except ValueError:
+        pass
+    else:
+        assert False, "Truncated stream accepted"
+
+
+@on_curve('DSTU_257')
+def test_verify_encoded(domain):
+    priv, pub = Priv.generate()
+    value_hash = 0xDEADBEEF
+    s, r = priv.sign(value_hash=value_hash)
+    assert pub.verify(value_hash=value_hash, signature=encode(s, r))
+    assert pub.verify(value_hash=value_hash, signature=encode(s, r, der=True))
+    try:
+        pub.verify(value_hash=value_hash, signature='\x04\x05abc')
+    except SignatureError:
+        pass
+    else:
+        assert False, "Bad encoding accepted"
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+
+from ukurwa4145.context import StandardDomain
+from ukurwa4145.math import HEX_DIGITS
+from ukurwa4145.parallel import Pool
+from ukurwa4145 import parallel
+from ukurwa4145 import tables
+
+ATTRS = ('_base_table', '_base_wnaf', '_squad_tables', '_sqr_tables')
+
+
+class Installed(object):
+    """Restore tables of curve class after test"""
+
+    def __init__(self, name):
+        self.cls = StandardDomain.resolve(name)
+
+    def __enter__(self):
+        self.saved = dict(
+            (attr, self.cls.__dict__[attr])
+            for attr in ATTRS if attr in self.cls.__dict__
+        )
+        return self.cls
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for attr in ATTRS:
+            if attr in self.cls.__dict__:
+                delattr(self.cls, attr)
+
+        for attr, val in self.saved.items():
+            setattr(self.cls, attr, val)
+
+
+def with_tmpdir(test):
+    def wrapper():
+        path = tempfile.mkdtemp()
+        try:
+            test(path)
+        finally:
+            shutil.rmtree(path)
+
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_tmpdir
+def test_roundtrip(tmpdir):
+    path = os.path.join(tmpdir, 'tables.bin')
+    built = StandardDomain.resolve('DSTU_163')()
+    tables.dump(path, ['DSTU_163'])
+
+    with Installed('DSTU_163') as cls:
+        for attr in ATTRS:
+            if attr in cls.__dict__:
+                delattr(cls, attr)
+
+        assert tables.load(path) == ['DSTU_163']
+        domain = cls()
+        for row, expect in zip(domain.base_table.table, built.base_table.table):
+            assert [row[digit] for digit in HEX_DIGITS] == [expect[digit] for digit in HEX_DIGITS]
+
+        assert domain.base_wnaf.table == built.base_wnaf.table
+        assert domain.field.squad_tables == built.field.comp_squad_tables()
+
+        priv, pub = domain.generate()
+        s, r = domain.sign(priv, 0x1234567)
+        assert domain.verify(pub, 0x1234567, s, r)
+
+
+def _patch_entry(data, kind, offset=0, count=0):
+    """Shift offset and count of section, keeping checksum valid"""
+    data = bytearray(data)
+    magic, version, entries, _ = tables.HEADER.unpack_from(data)
+    for idx in range(entries):
+        pos = tables.HEADER.size + tables.ENTRY.size * idx
+        name, entry_kind, entry_offset, entry_count = tables.ENTRY.unpack_from(data, pos)
+        if entry_kind.rstrip('\0') == kind:
+            tables.ENTRY.pack_into(data, pos, name, entry_kind,
+                                   entry_offset + offset, entry_count + count)
+
+    body = bytes(data[tables.HEADER.size:])
+    digest = hashlib.sha256(body).digest()
+    return tables.HEADER.pack(magic, version, entries, digest) + body
+
+
+@with_tmpdir
+def test_reject(tmpdir):
+    path = os.path.join(tmpdir, 'tables.bin')
+    tables.dump(path, ['DSTU_163'])
+    with open(path, 'rb') as fobj:
+        data = fobj.read()
+
+    damaged = (
+        data[:-1] + chr(ord(data[-1]) ^ 1),
+        'X' + data[1:],
+        data[:8] + chr(tables.VERSION + 1) + data[9:],
+        data[:20],
+        data[:10] + struct.pack('<H', 60000) + data[12:],
+        _patch_entry(data, 'squad', count=-16),
+        _patch_entry(data, 'squad', offset=len(data)),
+    )
+    with Installed('DSTU_163') as cls:
+        before = cls.__dict__.get('_base_table')
+        for data_bad in damaged:
+            with open(path, 'wb') as fobj:
+                fobj.write(data_bad)
+
+            try:
+                tables.load(path)
+            except ValueError:
+                pass
+            else:
+                assert False, "Damaged table file accepted"
+
+            assert cls.__dict__.get('_base_table') is before
+
+        with open(path, 'wb') as fobj:
+            fobj.write(data)
+
+        try:
+            tables.load(path, ['DSTU_257'])
+        except ValueError:
+            pass
+        else:
+            assert False, "Missing curve accepted"
+
+
+def _loaded_pid(name):
+    table = StandardDomain.get(name).base_table
+    return os.getpid(), getattr(table, 'loaded_pid', None)
+
+
+@with_tmpdir
+def test_pool(tmpdir):
+    path = os.path.join(tmpdir, 'tables.bin')
+    tables.dump(path, ['DSTU_163'])
+    domain = StandardDomain.resolve('DSTU_163')()
+    priv, pub = domain.generate()
+
+    def load(path, names):
+        # Mark tables with process that decoded them.
+        ret = tables.load(path, names)
+        for name in names:
+            StandardDomain.get(name).base_table.loaded_pid = os.getpid()
+        return ret
+
+    with Installed('DSTU_163'):
+        parallel.load_tables = load
+        try:
+            with Pool(1, curves=['DSTU_163'], tables=path) as pool:
+                worker_pid, loaded_pid = pool.pool.apply(_loaded_pid, ('DSTU_163',))
+                assert loaded_pid == os.getpid() != worker_pid
+
+                (s, r), = pool.sign('DSTU_163', [(priv, 0x1234567)])
+                assert pool.verify('DSTU_163', [(pub, 0x1234567, s, r)]) == [True]
+        finally:
+            parallel.load_tables = tables.load
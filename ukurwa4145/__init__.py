@@ -1,10 +1,10 @@
 from .context import curve, on_curve
 from .curves import DSTU_257
 from .math import Point, Field
-from .crypto import Priv, Pubkey
+from .crypto import Priv, Pubkey, verify_many
 
 __all__ = [
     'curve', 'on_curve',
-    'Point', 'Field', 'Priv', 'Pubkey',
+    'Point', 'Field', 'Priv', 'Pubkey', 'verify_many',
     'DSTU_257',
 ]
@@ -0,0 +1,167 @@
+"""Timing of field, point and protocol operations on standard curves.
+
+Run with python -m ukurwa4145.bench, see --help. Inputs come from
+fixed seed, so every run times the same operations.
+"""
+import random
+import timeit
+
+from ..context import StandardDomain
+from ..crypto import Priv
+from ..math import Point
+
+
+CURVES = ('DSTU_163', 'DSTU_257', 'DSTU_431')
+
+# name -> function(domain, rnd) returning callable to time
+CASES = []
+
+
+def case(name):
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+
+    return register
+
+
+def field_value(domain, rnd):
+    return long(rnd.getrandbits(domain.param_m - 1) | 1)
+
+
+@case('field.mul')
+def bench_mul(domain, rnd):
+    val_a, val_b = field_value(domain, rnd), field_value(domain, rnd)
+    return lambda: domain.field.mul(val_a, val_b)
+
+
+@case('field.sqr')
+def bench_sqr(domain, rnd):
+    val = field_value(domain, rnd)
+    return lambda: domain.field.sqr(val)
+
+
+@case('field.mod')
+def bench_mod(domain, rnd):
+    val = long(rnd.getrandbits(domain.param_m * 2 - 1))
+    return lambda: domain.field.mod(val)
+
+
+@case('field.inv')
+def bench_inv(domain, rnd):
+    val = field_value(domain, rnd)
+    return lambda: domain.field.inv(val)
+
+
+@case('field.inv_itoh')
+def bench_inv_itoh(domain, rnd):
+    val = field_value(domain, rnd)
+    domain.field.inv_itoh(val)
+    return lambda: domain.field.inv_itoh(val)
+
+
+@case('field.trace')
+def bench_trace(domain, rnd):
+    val = field_value(domain, rnd)
+    return lambda: domain.field.trace(val)
+
+
+@case('field.squad')
+def bench_squad(domain, rnd):
+    val = field_value(domain, rnd)
+    val ^= domain.field.trace(val)
+    return lambda: domain.field.squad(val)
+
+
+@case('point.mul')
+def bench_point_mul(domain, rnd):
+    point = domain.base * rnd.randint(1, domain.order - 1)
+    param_n = rnd.randint(1, domain.order - 1)
+    return lambda: point * param_n
+
+
+@case('point.mul_base')
+def bench_base_mul(domain, rnd):
+    param_n = rnd.randint(1, domain.order - 1)
+    return lambda: domain.base_table.mul(param_n)
+
+
+@case('point.expand')
+def bench_expand(domain, rnd):
+    packed = (domain.base * rnd.randint(1, domain.order - 1)).compress()
+    return lambda: Point.expand(packed, domain.curve)
+
+
+@case('point.compress')
+def bench_compress(domain, rnd):
+    point = domain.base * rnd.randint(1, domain.order - 1)
+    return point.compress
+
+
+@case('generate')
+def bench_generate(domain, rnd):
+    return domain.generate
+
+
+@case('sign')
+def bench_sign(domain, rnd):
+    priv = Priv(rnd.randint(1, domain.order - 1))
+    value_hash = rnd.getrandbits(domain.param_m - 8)
+    return lambda: domain.sign(priv, value_hash)
+
+
+@case('verify')
+def bench_verify(domain, rnd):
+    priv = Priv(rnd.randint(1, domain.order - 1))
+    pub = domain.pub(priv)
+    value_hash = rnd.getrandbits(domain.param_m - 8)
+    s, r = domain.sign(priv, value_hash)
+    return lambda: domain.verify(pub, value_hash, s, r)
+
+
+def run(curves=CURVES, cases=None, number=None, repeat=3, seed=4145):
+    """Return {curve: {case: best seconds per call}}.
+
+    Without number, every case is called enough times to take about
+    0.2s per repeat. One untimed call warms up tables and caches.
+    """
+    results = {}
+    for name in curves:
+        domain = StandardDomain.get(name)
+        results[name] = timings = {}
+        for case_name, setup in CASES:
+            if cases and case_name not in cases:
+                continue
+
+            # Priv.sign and generate draw from global random.
+            random.seed(seed)
+            func = setup(domain, random.Random(seed))
+            func()
+
+            count = number or calibrate(func)
+            best = min(timeit.repeat(func, number=count, repeat=repeat))
+            timings[case_name] = best / count
+
+    return results
+
+
+def calibrate(func, target=0.2):
+    count = 1
+    while True:
+        spent = timeit.timeit(func, number=count)
+        if spent >= target / 10 or count >= 1 << 20:
+            return max(1, int(count * target / max(spent, 1e-9)))
+
+        count *= 10
+
+
+def compare(results, baseline, threshold=0.1):
+    """Return (curve, case, old, new) for timings slower than baseline by threshold"""
+    slower = []
+    for name, timings in sorted(results.items()):
+        for case_name, new in sorted(timings.items()):
+            old = baseline.get(name, {}).get(case_name)
+            if old and new > old * (1 + threshold):
+                slower.append((name, case_name, old, new))
+
+    return slower
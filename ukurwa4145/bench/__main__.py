@@ -0,0 +1,55 @@
+import argparse
+import json
+import sys
+
+from . import CURVES, CASES, run, compare
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ukurwa4145.bench')
+    parser.add_argument('--curve', action='append', choices=CURVES,
+                        help='curve to time, default is all')
+    parser.add_argument('--case', action='append',
+                        choices=[name for name, _ in CASES],
+                        help='operation to time, default is all')
+    parser.add_argument('--number', type=int,
+                        help='calls per repeat, calibrated by default')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=4145)
+    parser.add_argument('--output', help='write results as json')
+    parser.add_argument('--baseline', help='compare with saved json results')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown against baseline, 0.1 is 10%%')
+    args = parser.parse_args(argv)
+
+    results = run(args.curve or CURVES, args.case, args.number,
+                  args.repeat, args.seed)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as fobj:
+            baseline = json.load(fobj)
+
+    for name, timings in sorted(results.items()):
+        for case_name, spent in sorted(timings.items()):
+            line = '%-9s %-15s %12.1f us' % (name, case_name, spent * 1e6)
+            old = baseline.get(name, {}).get(case_name)
+            if old:
+                line += '  %+6.1f%%' % ((spent / old - 1) * 100)
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as fobj:
+            json.dump(results, fobj, indent=2, sort_keys=True)
+
+    slower = compare(results, baseline, args.threshold)
+    for name, case_name, old, new in slower:
+        print('REGRESSION %s %s %.1f us -> %.1f us' % (
+            name, case_name, old * 1e6, new * 1e6
+        ))
+
+    return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
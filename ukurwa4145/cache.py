@@ -0,0 +1,109 @@
+from collections import OrderedDict
+import sys
+import threading
+
+from .math import FixedBase
+
+
+def table_size(table):
+    """Rough number of bytes held by FixedBase table"""
+    sample = table.table[0]['1']
+    point_size = (
+        sys.getsizeof(sample) +
+        sys.getsizeof(sample.xv) + sys.getsizeof(sample.yv)
+    )
+    row_size = sys.getsizeof(table.table[0]) + 15 * point_size
+    return len(table.table) * row_size
+
+
+class KeyCache(object):
+    """Size-bounded LRU cache of FixedBase tables for public keys.
+
+    Verification against key with cached table costs two fixed-base
+    multiplications and no doublings. Table is only built once key
+    was looked up min_uses times, so stream of one-off keys does not
+    pay for tables it never reuses.
+
+    Install with Pubkey.key_cache = KeyCache(...).
+    """
+
+    def __init__(self, maxsize=64, max_bytes=64 << 20, min_uses=2):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.min_uses = min_uses
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+        self._tables = OrderedDict()
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(domain, point):
+        return domain.NAME, point.xv, point.yv
+
+    def lookup(self, domain, point):
+        """Return table for point or None while key is not hot yet"""
+        key = self.key(domain, point)
+        with self._lock:
+            entry = self._tables.pop(key, None)
+            if entry is not None:
+                self._tables[key] = entry
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            seen = self._seen.pop(key, 0) + 1
+            if seen < self.min_uses:
+                self._seen[key] = seen
+                while len(self._seen) > self.maxsize * 4:
+                    self._seen.popitem(last=False)
+
+                return None
+
+        table = FixedBase(point, domain.order.bit_length())
+        self.add(domain, point, table)
+        return table
+
+    def add(self, domain, point, table):
+        key = self.key(domain, point)
+        size = table_size(table)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._tables.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+
+            self._tables[key] = (table, size)
+            self.nbytes += size
+
+            while len(self._tables) > self.maxsize or self.nbytes > self.max_bytes:
+                _, (_, old_size) = self._tables.popitem(last=False)
+                self.nbytes -= old_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._seen.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._tables),
+            'bytes': self.nbytes,
+        }
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, key):
+        return key in self._tables
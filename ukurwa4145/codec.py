@@ -0,0 +1,219 @@
+"""Binary encoding of curve points.
+
+Uncompressed point is 0x04 followed by X and Y, big-endian.
+Compressed point is X with trace bit in its lowest bit, stored
+little-endian the way DSTU 4145 certificates carry public keys.
+Both X and Y take (m + 7) / 8 bytes.
+"""
+from binascii import hexlify, unhexlify
+from collections import OrderedDict
+
+from .context import ldata
+from .math import Point
+
+
+FORMAT_UNCOMPRESSED = 4
+
+
+def field_size(curve):
+    return (curve.field.param_m + 7) // 8
+
+
+def int_from_bytes(data, little=False):
+    if little:
+        data = bytes(bytearray(data)[::-1])
+
+    return long(hexlify(data), 16)
+
+
+def int_to_bytes(val, size, little=False):
+    data = unhexlify('%0*x' % (size * 2, val))
+    if little:
+        data = data[::-1]
+
+    return data
+
+
+def _record(data):
+    if isinstance(data, memoryview):
+        return data.tobytes()
+
+    return bytes(data)
+
+
+def encode(point, compressed=True):
+    size = field_size(point.curve)
+    if compressed:
+        return int_to_bytes(point.compress(), size, little=True)
+
+    return (
+        chr(FORMAT_UNCOMPRESSED) +
+        int_to_bytes(point.xv, size) +
+        int_to_bytes(point.yv, size)
+    )
+
+
+def decode(data, curve=None):
+    """Decode point from str, bytearray, memoryview or mmap slice"""
+    if curve is None:
+        curve = ldata.curve
+
+    data = _record(data)
+    size = field_size(curve)
+    if len(data) == size * 2 + 1 and ord(data[0]) == FORMAT_UNCOMPRESSED:
+        return Point(
+            int_from_bytes(data[1:size + 1]),
+            int_from_bytes(data[size + 1:]),
+            curve=curve,
+        )
+
+    if len(data) == size:
+        x, y = Point.expand(int_from_bytes(data, little=True), curve)
+        return Point(x, y, curve=curve)
+
+    raise ValueError("Unknown point encoding")
+
+
+class DecodeCache(object):
+    """LRU of decoded (x, y) coordinates keyed by encoded bytes"""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._points = OrderedDict()
+
+    def get(self, key):
+        coords = self._points.pop(key, None)
+        if coords is None:
+            self.misses += 1
+            return None
+
+        self._points[key] = coords
+        self.hits += 1
+        return coords
+
+    def put(self, key, coords):
+        self._points.pop(key, None)
+        self._points[key] = coords
+        while len(self._points) > self.maxsize:
+            self._points.popitem(last=False)
+
+    def __len__(self):
+        return len(self._points)
+
+
+def _records(source, size, batch):
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(size * batch)
+            if not chunk:
+                return
+
+            if len(chunk) % size:
+                raise ValueError("Truncated point record")
+
+            for pos in xrange(0, len(chunk), size):
+                yield chunk[pos:pos + size]
+
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'find'):
+        if len(source) % size:
+            raise ValueError("Truncated point record")
+
+        for pos in xrange(0, len(source), size):
+            yield source[pos:pos + size]
+
+        return
+
+    for record in source:
+        yield record
+
+
+def decode_many(source, curve=None, size=None, batch=256, cache=None):
+    """Decode stream of points, yielding them in order.
+
+    source is str, bytearray, memoryview or mmap holding records of
+    size bytes, file object to read such records from, or iterable
+    of separate encoded points. Default size is one compressed point.
+    Compressed points are expanded batch at a time with single field
+    inversion. cache is optional DecodeCache shared between calls.
+    Invalid record raises ValueError naming its index, after every
+    point before it is yielded.
+    """
+    if curve is None:
+        curve = ldata.curve
+
+    if size is None:
+        size = field_size(curve)
+
+    pending = []
+    start = 0
+    for record in _records(source, size, batch):
+        pending.append(_record(record))
+        if len(pending) >= batch:
+            for point in _decode_checked(pending, start, curve, cache):
+                yield point
+
+            start += len(pending)
+            pending = []
+
+    for point in _decode_checked(pending, start, curve, cache):
+        yield point
+
+
+def _decode_checked(records, start, curve, cache):
+    """Decode batch, redoing it record by record to name bad one"""
+    try:
+        points = list(_decode_batch(records, curve, cache))
+    except ValueError:
+        points = None
+
+    if points is not None:
+        for point in points:
+            yield point
+
+        return
+
+    for idx, data in enumerate(records):
+        try:
+            point, = _decode_batch([data], curve, cache)
+        except ValueError as e:
+            raise ValueError("Bad point record {}: {}".format(start + idx, e))
+
+        yield point
+
+
+def _decode_batch(records, curve, cache):
+    size = field_size(curve)
+    coords = {}
+    packed = []
+    fresh = []
+    for data in records:
+        if data in coords:
+            continue
+
+        if cache is not None:
+            coords[data] = cache.get(data)
+            if coords[data] is not None:
+                continue
+
+        fresh.append(data)
+        if len(data) == size:
+            packed.append(data)
+            continue
+
+        point = decode(data, curve)
+        coords[data] = (point.xv, point.yv)
+
+    values = [int_from_bytes(data, little=True) for data in packed]
+    coords.update(zip(packed, Point.expand_many(values, curve)))
+
+    if cache is not None:
+        for data in fresh:
+            cache.put(data, coords[data])
+
+    for data in records:
+        x, y = coords[data]
+        yield Point(x, y, curve=curve)
@@ -7,12 +7,16 @@ ldata = threading.local()
 
 @contextmanager
 def curve(name):
-    ldata.curve_domain = StandardDomain.resolve(name)()
-    ldata.curve = ldata.curve_domain.curve
-    ldata.modulus = ldata.curve_domain.modulus
-    yield ldata.curve_domain
+    """Make domain current for code that does not pass it explicitly"""
+    domain = StandardDomain.get(name)
+    ldata.curve_domain = domain
+    ldata.curve = domain.curve
+    ldata.field = domain.field
+    ldata.modulus = domain.modulus
+    yield domain
     del ldata.curve_domain
     del ldata.curve
+    del ldata.field
     del ldata.modulus
 
 
@@ -27,30 +31,74 @@ def on_curve(name):
 
 
 class Curve(object):
-    def __init__(self, field_a, field_b):
+    def __init__(self, field_a, field_b, field=None):
         self.field_a = field_a
         self.field_b = field_b
+        self.field = field
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError("Curve is immutable")
+
+        super(Curve, self).__setattr__(name, value)
 
     def __contains__(self, point):
-        lh = Field.add(point.x.v, self.field_a)
-        lh = Field.mul(lh, point.x.v)
-        lh = Field.add(lh, point.y.v)
-        lh = Field.mul(lh, point.x.v)
-        lh = Field.add(lh, self.field_b)
-        y2 = Field.mul(point.y.v, point.y.v)
-        lh = Field.add(lh, y2)
+        field = self.field
+        lh = field.add(point.xv, self.field_a)
+        lh = field.mul(lh, point.xv)
+        lh = field.add(lh, point.yv)
+        lh = field.mul(lh, point.xv)
+        lh = field.add(lh, self.field_b)
+        y2 = field.sqr(point.yv)
+        lh = field.add(lh, y2)
 
         return lh == 0
 
 
 class Domain(object):
-    def __init__(self, param_m, nom_k, curve, order, base=None):
+    """Curve parameters together with field and point engines.
+
+    Every operation below works on this domain explicitly and does
+    not need curve() context, so one thread can serve any number
+    of curves at once.
+    """
+
+    def __init__(self, param_m, nom_k, curve, order, base=None, field_inv='euclid'):
         self.param_m = param_m
         self.nom_k = nom_k
         self.curve = curve
         self.order = order
         self._base = base
-        self.modulus = Field.comp_modulus(param_m, *self.nom_k)
+        self.field = FieldEngine(param_m, nom_k, order, inv=field_inv)
+        self.modulus = self.field.modulus
+        curve.field = self.field
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError("Domain is immutable")
+
+        super(Domain, self).__setattr__(name, value)
+
+    def point(self, x, y):
+        return Point(x, y, curve=self.curve)
+
+    def generate(self):
+        return Priv.generate(domain=self)
+
+    def pub(self, priv):
+        return priv.pub(domain=self)
+
+    def sign(self, priv, value_hash):
+        return priv.sign(value_hash=value_hash, domain=self)
+
+    def verify(self, pub, value_hash, s, r):
+        return pub.verify(value_hash=value_hash, s=s, r=r, domain=self)
+
+    def verify_many(self, items):
+        return verify_many(items, domain=self)
+
+    def agree(self, priv, pubkey, cofactor=True):
+        return priv.agree(pubkey, cofactor=cofactor, domain=self)
 
     def __exit__(self, exc_type, exc_value, tracebac):
         pass
@@ -69,11 +117,40 @@ class RegisterDomain(type):
 
 
 class StandardDomain(Domain):
+    """Standard curve with its base point.
+
+    Instances are immutable once built, so are their curve, base
+    point and field parameters. get() returns one instance
+    per curve shared by the whole process, which is what curve()
+    context uses.
+    """
+
     REGISTRY = {}
+    INSTANCES = {}
+    INSTANCES_LOCK = threading.Lock()
+    BASE_WNAF_WIDTH = 7
+    # Binary Euclid beats Itoh-Tsujii on every registered curve,
+    # set to 'itoh' in subclass to use it instead.
+    FIELD_INV = 'euclid'
     __metaclass__ = RegisterDomain
     def __init__(self):
         curve = Curve(self.PARAM_A, self.PARAM_B)
-        super(StandardDomain, self).__init__(self.PARAM_M, self.PARAM_K, curve, self.ORDER)
+        super(StandardDomain, self).__init__(
+            self.PARAM_M, self.PARAM_K, curve, self.ORDER,
+            field_inv=self.FIELD_INV,
+        )
+        # Field tables loaded from file by tables.load(), if any.
+        cls = type(self)
+        squad_tables = cls.__dict__.get('_squad_tables')
+        if squad_tables is not None:
+            self.field.squad_tables = squad_tables
+
+        self.field.sqr_tables.update(cls.__dict__.get('_sqr_tables', {}))
+
+        self._base = FrozenPoint(self.BASE_X, self.BASE_Y, curve=self.curve)
+        self.curve._frozen = True
+        self.field._frozen = True
+        self._frozen = True
 
     @classmethod
     def register(cls, name, curve):
@@ -86,16 +163,45 @@ class StandardDomain(Domain):
         except KeyError:
             raise ValueError("Standard curve {} not found".format(name))
 
+    @classmethod
+    def get(cls, name):
+        """Process-wide instance of named curve, built on first use"""
+        domain = cls.INSTANCES.get(name)
+        if domain is not None:
+            return domain
+
+        with cls.INSTANCES_LOCK:
+            domain = cls.INSTANCES.get(name)
+            if domain is None:
+                domain = cls.INSTANCES[name] = cls.resolve(name)()
+
+        return domain
+
     @property
     def base(self):
-        try:
-            base = self._base
-            if base is None:
-                raise AttributeError()
-        except AttributeError:
-            base = Point(self.BASE_X, self.BASE_Y)
-            self._base = base
+        return self._base
 
-        return base
+    @property
+    def base_table(self):
+        """Fixed-base table for base point, shared by all instances of curve"""
+        cls = type(self)
+        table = cls.__dict__.get('_base_table')
+        if table is None:
+            table = FixedBase(self.base, self.order.bit_length())
+            cls._base_table = table
 
-from . math import Field, Point
+        return table
+
+    @property
+    def base_wnaf(self):
+        """Odd multiples of base point for wNAF, shared like base_table"""
+        cls = type(self)
+        table = cls.__dict__.get('_base_wnaf')
+        if table is None:
+            table = OddMultiples(self.base, self.BASE_WNAF_WIDTH)
+            cls._base_wnaf = table
+
+        return table
+
+from . math import FieldEngine, Point, FrozenPoint, FixedBase, OddMultiples
+from . crypto import Priv, verify_many
@@ -0,0 +1,204 @@
+"""Opt-in call counters for field, point and protocol operations.
+
+Nothing is wrapped until Counters is installed, so disabled counters
+cost nothing. While installed, every counted call is attributed to
+outermost logical operation (sign, verify, generate, agree, expand)
+running in the same thread, or to 'other' outside of them.
+Times are inclusive: sqr time also covers mod calls made from it.
+
+    counters = Counters()
+    with counters:
+        domain.verify(pub, value_hash, s, r)
+    counters.as_dict()['verify']['field.mul']['calls']
+"""
+from functools import wraps
+import threading
+import time
+import weakref
+
+from .math import FieldEngine, Point, ProjPoint, FixedBase
+from .crypto import Priv, Pubkey
+
+
+FIELD_OPS = ('mul', 'sqr', 'mod', 'inv', 'batch_inv', 'trace', 'squad')
+ENGINE_BOUND = ('mod', 'inv')
+
+POINT_OPS = (
+    (Point, 'add', 'point.add'),
+    (Point, '__add__', 'point.add'),
+    (Point, 'mul', 'point.mul'),
+    (Point, '__mul__', 'point.mul'),
+    (Point, 'mul_x', 'point.mul_x'),
+    (Point, 'mul2', 'point.mul2'),
+    (ProjPoint, 'double', 'point.double'),
+    (ProjPoint, 'idouble', 'point.double'),
+    (ProjPoint, 'add_mixed', 'point.add_mixed'),
+    (ProjPoint, 'iadd_mixed', 'point.add_mixed'),
+    (ProjPoint, 'add', 'point.add_proj'),
+    (ProjPoint, '__add__', 'point.add_proj'),
+    (FixedBase, 'mul_proj', 'point.mul_base'),
+    (Priv, '_help_sign', 'sign.attempt'),
+    (Pubkey, 'validate', 'validate'),
+)
+
+OPERATIONS = (
+    (Priv, 'sign', 'sign'),
+    (Priv, 'generate', 'generate'),
+    (Priv, 'agree', 'agree'),
+    (Pubkey, 'verify', 'verify'),
+    (Point, 'expand', 'expand'),
+)
+
+OTHER = 'other'
+
+
+class Counters(object):
+    """Collect calls and time per logical operation.
+
+    hook, when given, is called as hook(operation, stats) after every
+    outermost operation, stats being {name: (calls, seconds)} of that
+    single call. Only one Counters can be installed at a time.
+    """
+
+    installed = None
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.reset()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._patched = []
+        self._engines = weakref.WeakKeyDictionary()
+
+    def reset(self):
+        self.stats = {}
+
+    def as_dict(self):
+        """{operation: {name: {'calls': n, 'time': seconds}}}"""
+        with self._lock:
+            return dict(
+                (operation, dict(
+                    (name, {'calls': calls, 'time': spent})
+                    for name, (calls, spent) in counts.items()
+                ))
+                for operation, counts in self.stats.items()
+            )
+
+    def _record(self, name, spent):
+        local = self._local
+        current = getattr(local, 'current', None)
+        if current is not None:
+            calls, total = current.get(name, (0, 0.0))
+            current[name] = (calls + 1, total + spent)
+            return
+
+        self._merge(OTHER, {name: (1, spent)})
+
+    def _merge(self, operation, counts):
+        with self._lock:
+            stats = self.stats.setdefault(operation, {})
+            for name, (calls, spent) in counts.items():
+                old_calls, old_spent = stats.get(name, (0, 0.0))
+                stats[name] = (old_calls + calls, old_spent + spent)
+
+    def _count(self, func, name):
+        record = self._record
+
+        @wraps(func)
+        def counted(*args, **kwargs):
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.time() - start)
+
+        return counted
+
+    def _operation(self, func, operation):
+        local = self._local
+
+        @wraps(func)
+        def operation_call(*args, **kwargs):
+            if getattr(local, 'current', None) is not None:
+                return func(*args, **kwargs)
+
+            local.current = counts = {}
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counts[operation] = (1, time.time() - start)
+                local.current = None
+                self._merge(operation, counts)
+                if self.hook is not None:
+                    self.hook(operation, counts)
+
+        return operation_call
+
+    def _count_engine(self, func, name):
+        counted = self._count(func, name)
+        engines = self._engines
+        count_bound = self._count_bound
+
+        @wraps(func)
+        def engine_call(engine, *args, **kwargs):
+            if engine not in engines:
+                count_bound(engine)
+            return counted(engine, *args, **kwargs)
+
+        return engine_call
+
+    def _count_bound(self, engine):
+        # Sparse reduction and selected inversion are bound
+        # to engine instance, not class.
+        bound = {}
+        for attr in ENGINE_BOUND:
+            func = engine.__dict__.get(attr)
+            if func is not None:
+                bound[attr] = func
+                setattr(engine, attr, self._count(func, 'field.' + attr))
+
+        self._engines[engine] = bound
+
+    def _patch(self, cls, attr, wrap, name):
+        original = cls.__dict__[attr]
+        if isinstance(original, (classmethod, staticmethod)):
+            wrapped = type(original)(wrap(original.__func__, name))
+        else:
+            wrapped = wrap(original, name)
+
+        self._patched.append((cls, attr, original))
+        setattr(cls, attr, wrapped)
+
+    def install(self):
+        if Counters.installed is not None:
+            raise ValueError("Counters are already installed")
+
+        Counters.installed = self
+        for attr in FIELD_OPS:
+            self._patch(FieldEngine, attr, self._count_engine, 'field.' + attr)
+
+        for cls, attr, name in POINT_OPS:
+            self._patch(cls, attr, self._count, name)
+
+        for cls, attr, name in OPERATIONS:
+            self._patch(cls, attr, self._operation, name)
+
+    def uninstall(self):
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+
+        for engine, bound in list(self._engines.items()):
+            for attr, func in bound.items():
+                setattr(engine, attr, func)
+
+        self._patched = []
+        self._engines.clear()
+        Counters.installed = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
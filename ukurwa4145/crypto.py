@@ -1,9 +1,18 @@
-from .math import Field
+from .math import Point, FixedBase, OddMultiples
 from . context import ldata
+from .gost34311 import hash_value
+from .signature import decode as decode_signature
 
+from binascii import hexlify
 import random
 
 
+# Key with this many signatures in one verify_many() batch
+# gets full FixedBase table, which pays for itself after about a dozen
+# signatures on every registered curve.
+BATCH_FIXED_KEY = 16
+
+
 class ParamError(TypeError):
     pass
 
@@ -12,20 +21,39 @@ class SignatureError(Exception):
     pass
 
 
+class BatchSignatureError(SignatureError):
+    def __init__(self, message, bad):
+        super(BatchSignatureError, self).__init__(message)
+        self.bad = bad
+
+
+def value_hash_of(value):
+    """GOST 34.311 hash of str, buffer, mmap or file object as integer.
+
+    Digest is read little-endian, same as DSTU 4145 documents carry it.
+    """
+    digest = hash_value(value).digest()
+    return long(hexlify(digest[::-1]), 16)
+
+
 class Pubkey(object):
+    # Opt-in KeyCache with precomputed tables for frequently used keys.
+    key_cache = None
+
     def __init__(self, point):
         self.point = point
 
-    def verify(self, value=None, value_hash=None, s=None, r=None, signature=None):
+    def verify(self, value=None, value_hash=None, s=None, r=None,
+               signature=None, domain=None):
         if value is not None:
-            raise ValueError("Hashing not supported yet")
-
-        if signature is not None:
-            raise ValueError("Signature unpack is not supported yet")
+            value_hash = value_hash_of(value)
 
-        domain = ldata.curve_domain
+        domain = domain or ldata.curve_domain
         try:
-            truncated = Field.truncate(value_hash)
+            if signature is not None:
+                s, r = decode_signature(signature, domain)
+
+            truncated = domain.field.truncate(value_hash, domain.param_m)
             ok = self._help_verify(truncated, s, r, domain)
             if not ok:
                 raise SignatureError("Signature does not match")
@@ -42,17 +70,27 @@ class Pubkey(object):
         if s > domain.order or r > domain.order:
             raise ValueError("Signature value cannot be grater than order")
 
-        mulQ = self.point * r
-        mulS = domain.base * s
-
-        pointR = mulS + mulQ
+        pointR = self._mul_verify(s, r, domain).to_affine()
         if pointR.infinity:
             raise ValueError("Invalid signature. R point is infinity")
 
-        r1 = Field.mul(long(value), pointR.x.v)
-        r1 = Field.truncate(r1)
+        field = domain.field
+        r1 = field.mul(long(value), pointR.xv)
+        r1 = field.truncate(r1)
         return r1 == r
 
+    def _mul_verify(self, s, r, domain):
+        cache = self.key_cache
+        table = cache.lookup(domain, self.point) if cache is not None else None
+        if table is not None:
+            return domain.base_table.mul_proj(s) + table.mul_proj(r)
+
+        return Point.mul2(s, domain.base_wnaf, r, self.point)
+
+    def verify_batch(self, items, domain=None):
+        """Verify many (value_hash, s, r) signatures made by this key"""
+        return verify_many([(self,) + tuple(item) for item in items], domain)
+
     def validate(self, domain):
         pub_q = self.point
         if pub_q.infinity:
@@ -68,19 +106,94 @@ class Pubkey(object):
     def __eq__(self, other):
         return self.point == other.point
 
+def verify_many(items, domain=None):
+    """Verify many (pubkey, value_hash, s, r) signatures in one pass.
+
+    Signatures made by the same key share precomputation: wNAF odd
+    multiples for rare keys and FixedBase table for keys that are hot
+    in Pubkey.key_cache or sign at least BATCH_FIXED_KEY signatures in
+    batch, so their R points need no doublings at all. All R points
+    are brought to affine with a single field inversion.
+    DSTU 4145 signature only keeps truncated h * R.x, so R cannot be
+    recovered to check all signatures with one combined equation.
+    Every signature is still compared on its own, which also tells
+    exactly which of them are bad.
+
+    Returns True or raises BatchSignatureError listing indexes of bad items.
+    """
+    domain = domain or ldata.curve_domain
+    field = domain.field
+    cache = Pubkey.key_cache
+    items = list(items)
+
+    counts = {}
+    for pubkey, value_hash, s, r in items:
+        key = (pubkey.point.xv, pubkey.point.yv)
+        counts[key] = counts.get(key, 0) + 1
+
+    tables = {}
+    pending = []
+    bad = []
+    for idx, (pubkey, value_hash, s, r) in enumerate(items):
+        if s == 0 or r == 0 or s > domain.order or r > domain.order:
+            bad.append(idx)
+            continue
+
+        point = pubkey.point
+        key = (point.xv, point.yv)
+        table = tables.get(key)
+        if table is None:
+            if cache is not None:
+                table = cache.lookup(domain, point)
+
+            if table is None and counts[key] >= BATCH_FIXED_KEY:
+                table = FixedBase(point, domain.order.bit_length())
+                if cache is not None:
+                    cache.add(domain, point, table)
+
+            if table is None:
+                width = OddMultiples.width_for(domain.order.bit_length())
+                table = OddMultiples(point, width)
+
+            tables[key] = table
+
+        if isinstance(table, FixedBase):
+            point_r = domain.base_table.mul_proj(s) + table.mul_proj(r)
+        else:
+            point_r = Point.mul2(s, domain.base_wnaf, r, table)
+
+        if point_r.infinity:
+            bad.append(idx)
+            continue
+
+        pending.append((idx, field.truncate(value_hash, domain.param_m), r, point_r))
+
+    z_invs = field.batch_inv([point_r.z for _, _, _, point_r in pending])
+    for (idx, value, r, point_r), z_inv in zip(pending, z_invs):
+        x = field.mul(point_r.x, z_inv)
+        r1 = field.truncate(field.mul(long(value), x))
+        if r1 != r:
+            bad.append(idx)
+
+    if bad:
+        raise BatchSignatureError("Signatures do not match", sorted(bad))
+
+    return True
+
+
 class Priv(object):
     def __init__(self, d):
         self.param_d = d
 
     @classmethod
-    def generate(cls):
-        domain = ldata.curve_domain
+    def generate(cls, domain=None):
+        domain = domain or ldata.curve_domain
 
         rand_d = random.randint(1, domain.order)
 
         while True:
             priv = cls(rand_d)
-            pub = priv.pub()
+            pub = priv.pub(domain)
 
             try:
                 pub.validate(domain)
@@ -89,22 +202,39 @@ class Priv(object):
 
             return priv, pub
 
-    def pub(self):
-        domain = ldata.curve_domain
+    def pub(self, domain=None):
+        domain = domain or ldata.curve_domain
 
-        point_q = (domain.base * self.param_d).negate()
+        point_q = domain.base_table.mul(self.param_d).negate()
         return Pubkey(point_q)
 
-    def sign(self, value=None, value_hash=None):
-        domain = ldata.curve_domain
+    def agree(self, pubkey, cofactor=True, domain=None):
+        """Compute shared secret ZZ, X coordinate of d * h * Q.
+
+        Cofactor is folded into scalar, so this is one x-only ladder.
+        """
+        domain = domain or ldata.curve_domain
 
-        if not value and not value_hash:
+        param_k = self.param_d
+        if cofactor:
+            param_k = param_k * domain.COFACTOR
+
+        zz = pubkey.point.mul_x(param_k)
+        if zz is None:
+            raise ValueError("Shared point is infinity")
+
+        return zz
+
+    def sign(self, value=None, value_hash=None, domain=None):
+        domain = domain or ldata.curve_domain
+
+        if value is None and not value_hash:
             raise ValueError("Nothing to sign")
 
-        if not value_hash:
-            raise ValueError("Hashing is not supported yet")
+        if value is not None:
+            value_hash = value_hash_of(value)
 
-        truncated = Field.truncate(value_hash, domain.param_m)
+        truncated = domain.field.truncate(value_hash, domain.param_m)
         while True:
             try:
                 rand_e = random.randint(1, domain.order)
@@ -113,13 +243,14 @@ class Priv(object):
                 pass
 
     def _help_sign(self, value, rand_e, domain):
-        eG = domain.base * rand_e
-        if eG.x.v == 0:
+        eG = domain.base_table.mul(rand_e)
+        if eG.xv == 0:
             raise ParamError("Random point have zero X coord")
 
-        value = Field.truncate(value, domain.param_m)
-        r = Field.mul(value, eG.x.v)
-        r = Field.truncate(r)
+        field = domain.field
+        value = field.truncate(value, domain.param_m)
+        r = field.mul(value, eG.xv)
+        r = field.truncate(r)
         if r == 0:
             raise ParamError("Got zero R")
 
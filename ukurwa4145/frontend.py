@@ -0,0 +1,320 @@
+"""Non-blocking front-end for sign and verify.
+
+Requests return Future immediately and are computed on executor
+threads, so event loop or request handler is not blocked for the
+milliseconds every operation takes. Domain is captured in calling
+thread at submit time and passed to workers explicitly, thread-local
+curve() context is never read on executor threads.
+"""
+from multiprocessing.pool import ThreadPool
+import logging
+import Queue
+import threading
+import time
+
+from .context import ldata
+from .crypto import SignatureError, BatchSignatureError, verify_many
+
+
+log = logging.getLogger(__name__)
+
+
+class CancelledError(Exception):
+    pass
+
+
+class Full(Exception):
+    pass
+
+
+class TimeoutError(Exception):
+    pass
+
+
+class Closed(Exception):
+    pass
+
+
+class Future(object):
+    """Result of request that is computed elsewhere.
+
+    Same surface as concurrent.futures.Future: result(), exception(),
+    cancel(), done() and add_done_callback(). Callbacks run in worker
+    thread, use loop.call_soon_threadsafe or alike to hand result
+    over to event loop.
+    """
+
+    PENDING, RUNNING, CANCELLED, FINISHED = range(4)
+
+    def __init__(self):
+        self._state = self.PENDING
+        self._result = None
+        self._error = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+
+    def cancel(self):
+        with self._lock:
+            if self._state == self.CANCELLED:
+                return True
+            if self._state != self.PENDING:
+                return False
+
+            self._state = self.CANCELLED
+
+        self._finish()
+        return True
+
+    def cancelled(self):
+        return self._state == self.CANCELLED
+
+    def running(self):
+        return self._state == self.RUNNING
+
+    def done(self):
+        return self._state in (self.CANCELLED, self.FINISHED)
+
+    def set_running_or_notify_cancel(self):
+        with self._lock:
+            if self._state == self.CANCELLED:
+                return False
+
+            self._state = self.RUNNING
+            return True
+
+    def set_result(self, result):
+        self._set(result, None)
+        self._finish()
+
+    def set_exception(self, error):
+        self._set(None, error)
+        self._finish()
+
+    def _set(self, result, error):
+        # Outcome without callbacks, batch sets all its futures
+        # before running any callback.
+        with self._lock:
+            self._result = result
+            self._error = error
+            self._state = self.FINISHED
+
+    def _finish(self):
+        self._event.set()
+        for callback in self._callbacks:
+            _call(callback, self)
+
+    def add_done_callback(self, callback):
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(callback)
+                return
+
+        _call(callback, self)
+
+    def exception(self, timeout=None):
+        if not self._event.wait(timeout):
+            raise TimeoutError("Timeout waiting for result")
+
+        if self._state == self.CANCELLED:
+            raise CancelledError()
+
+        return self._error
+
+    def result(self, timeout=None):
+        error = self.exception(timeout)
+        if error is not None:
+            raise error
+
+        return self._result
+
+
+def _call(callback, future):
+    try:
+        callback(future)
+    except Exception:
+        log.exception("Exception in callback of %r", future)
+
+
+def _fail(futures, error):
+    for future in futures:
+        if future.set_running_or_notify_cancel():
+            future.set_exception(error)
+
+
+def _run(future, func, args, kwargs):
+    if not future.set_running_or_notify_cancel():
+        return
+
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+class Frontend(object):
+    """Bounded queue of sign and verify requests in front of executor.
+
+    executor is anything with apply_async(func, args), like
+    multiprocessing.pool.ThreadPool, default is pool of one thread.
+    At most max_inflight requests are pending at once, further submits
+    block or raise Full when block is False. Verify requests that
+    arrive within batch_delay seconds of each other are coalesced into
+    one verify_many() call of up to batch_size signatures.
+    """
+
+    def __init__(self, domain=None, executor=None, max_inflight=64,
+                 batch_size=16, batch_delay=0.002):
+        self.domain = domain
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPool(1)
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._queue = Queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        self._dispatcher = threading.Thread(target=self._dispatch)
+        self._dispatcher.daemon = True
+        self._dispatcher.start()
+
+    def _resolve(self, domain):
+        domain = domain or self.domain or getattr(ldata, 'curve_domain', None)
+        if domain is None:
+            raise ValueError("No domain given and no curve() context is active")
+
+        return domain
+
+    def _future(self, block):
+        if self._closed:
+            raise Closed("Frontend is closed")
+
+        if not self._slots.acquire(block):
+            raise Full("Too many requests in flight")
+
+        future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def sign(self, priv, value_hash, domain=None, block=True):
+        domain = self._resolve(domain)
+        future = self._future(block)
+        kwargs = {'value_hash': value_hash, 'domain': domain}
+        try:
+            self.executor.apply_async(_run, (future, priv.sign, (), kwargs))
+        except Exception as e:
+            _fail([future], e)
+
+        return future
+
+    def verify(self, pubkey, value_hash, s, r, domain=None, block=True):
+        domain = self._resolve(domain)
+        future = self._future(block)
+        with self._close_lock:
+            # Dispatcher is gone once close() queued its sentinel.
+            if self._closed:
+                _fail([future], Closed("Frontend is closed"))
+            else:
+                self._queue.put((domain, future, (pubkey, value_hash, s, r)))
+
+        return future
+
+    def _dispatch(self):
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except Queue.Empty:
+                    break
+
+                if item is None:
+                    running = False
+                    break
+
+                batch.append(item)
+
+            by_domain = {}
+            for domain, future, job in batch:
+                by_domain.setdefault(id(domain), (domain, []))[1].append((future, job))
+
+            for domain, entries in by_domain.values():
+                try:
+                    self.executor.apply_async(_verify_batch, (domain, entries))
+                except Exception as e:
+                    _fail([future for future, _ in entries], e)
+
+    def close(self):
+        """Finish pending requests and stop dispatcher.
+
+        Requests made after close raise Closed.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._queue.put(None)
+
+        self._dispatcher.join()
+        if self._own_executor:
+            self.executor.close()
+            self.executor.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _verify_batch(domain, entries):
+    entries = [
+        (future, job) for future, job in entries
+        if future.set_running_or_notify_cancel()
+    ]
+    if not entries:
+        return
+
+    try:
+        _resolve_batch(domain, entries)
+    finally:
+        for future, _ in entries:
+            future._finish()
+
+
+def _resolve_batch(domain, entries):
+    bad = ()
+    try:
+        verify_many([job for _, job in entries], domain=domain)
+    except BatchSignatureError as e:
+        bad = set(e.bad)
+    except Exception:
+        # Requests share batch only by timing, so malformed one
+        # must not fail the others: verify them one by one.
+        for future, (pubkey, value_hash, s, r) in entries:
+            try:
+                future._set(domain.verify(pubkey, value_hash, s, r), None)
+            except Exception as e:
+                future._set(None, e)
+        return
+
+    for idx, (future, _) in enumerate(entries):
+        if idx in bad:
+            future._set(None, SignatureError("Signature does not match"))
+        else:
+            future._set(True, None)
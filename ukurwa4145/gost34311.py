@@ -0,0 +1,213 @@
+"""GOST 34.311-95 hash function over GOST 28147-89 block cipher.
+
+Same algorithm as GOST R 34.11-94. Values are kept as integers,
+blocks and digest are read and written little-endian.
+Hashing is incremental:
+
+    ctx = Gost34311()
+    ctx.update(chunk)
+    ctx.update_from(fobj)
+    ctx.digest()
+"""
+from struct import pack, unpack_from
+from binascii import hexlify
+
+
+# DKE #1 S-box, default of DSTU 4145-2002, rows K1 .. K8.
+# Row K1 substitutes lowest four bits of cipher round input.
+SBOX_DKE1 = (
+    (0xA, 0x9, 0xD, 0x6, 0xE, 0xB, 0x4, 0x5, 0xF, 0x1, 0x3, 0xC, 0x7, 0x0, 0x8, 0x2),
+    (0x8, 0x0, 0xC, 0x4, 0x9, 0x6, 0x7, 0xB, 0x2, 0x3, 0x1, 0xF, 0x5, 0xE, 0xA, 0xD),
+    (0xF, 0x6, 0x5, 0x8, 0xE, 0xB, 0xA, 0x4, 0xC, 0x0, 0x3, 0x7, 0x2, 0x9, 0x1, 0xD),
+    (0x3, 0x8, 0xD, 0x9, 0x6, 0xB, 0xF, 0x0, 0x2, 0x5, 0xC, 0xA, 0x4, 0xE, 0x1, 0x7),
+    (0xF, 0x8, 0xE, 0x9, 0x7, 0x2, 0x0, 0xD, 0xC, 0x6, 0x1, 0x5, 0xB, 0x4, 0x3, 0xA),
+    (0x2, 0x8, 0x9, 0x7, 0x5, 0xF, 0x0, 0xB, 0xC, 0x1, 0xD, 0xE, 0xA, 0x3, 0x6, 0x4),
+    (0x3, 0x8, 0xB, 0x5, 0x6, 0x4, 0xE, 0xA, 0x2, 0xC, 0x1, 0x7, 0x9, 0xF, 0xD, 0x0),
+    (0x1, 0x2, 0x3, 0xE, 0x6, 0xD, 0xB, 0x8, 0xF, 0xA, 0xC, 0x5, 0x7, 0x9, 0x0, 0x4),
+)
+
+# Test parameters of GOST R 34.11-94, rows K1 .. K8.
+SBOX_TEST = (
+    (4, 10, 9, 2, 13, 8, 0, 14, 6, 11, 1, 12, 7, 15, 5, 3),
+    (14, 11, 4, 12, 6, 13, 15, 10, 2, 3, 8, 1, 0, 7, 5, 9),
+    (5, 8, 1, 13, 10, 3, 4, 2, 14, 15, 12, 7, 6, 0, 9, 11),
+    (7, 13, 10, 1, 0, 8, 9, 15, 14, 4, 6, 12, 11, 2, 5, 3),
+    (6, 12, 7, 1, 5, 15, 13, 8, 4, 10, 9, 14, 0, 3, 11, 2),
+    (4, 11, 10, 0, 7, 2, 1, 13, 3, 6, 8, 5, 9, 12, 15, 14),
+    (13, 11, 4, 1, 3, 15, 5, 9, 0, 10, 14, 7, 6, 8, 2, 12),
+    (1, 15, 13, 0, 5, 7, 10, 4, 9, 2, 3, 14, 6, 11, 8, 12),
+)
+
+BLOCK_SIZE = 32
+CHUNK_SIZE = 1 << 20
+
+MASK32 = 0xFFFFFFFF
+MASK64 = (1 << 64) - 1
+MASK256 = (1 << 256) - 1
+
+C3 = 0xff00ffff000000ffff0000ff00ffff0000ff00ff00ff00ffff00ff00ff00ff00
+
+# Round keys are taken k1 .. k8 three times, then k8 .. k1.
+KEY_ORDER = range(8) * 3 + range(7, -1, -1)
+
+# Byte i of key K_j is byte 8 * (i % 4) + i // 4 of W.
+P_ORDER = [8 * (idx % 4) + idx // 4 for idx in range(32)]
+
+
+def round_tables(sbox):
+    """Per-byte tables of cipher round: substitution, then rotation by 11"""
+    tables = []
+    for pos in range(4):
+        low, high = sbox[pos * 2], sbox[pos * 2 + 1]
+        table = []
+        for byte in range(256):
+            val = ((high[byte >> 4] << 4) | low[byte & 15]) << (pos * 8)
+            table.append(((val << 11) | (val >> 21)) & MASK32)
+        tables.append(table)
+
+    return tables
+
+
+def transform_a(val):
+    y1 = val & MASK64
+    y2 = (val >> 64) & MASK64
+    return (val >> 64) | ((y1 ^ y2) << 192)
+
+
+def transform_p(val):
+    data = bytearray(pack('<4Q', *[(val >> (64 * idx)) & MASK64 for idx in range(4)]))
+    data = bytearray(data[pos] for pos in P_ORDER)
+    return long(hexlify(bytes(data[::-1])), 16)
+
+
+def transform_psi(val, count):
+    for idx in xrange(count):
+        word = val ^ (val >> 16) ^ (val >> 32) ^ (val >> 48) ^ (val >> 192) ^ (val >> 240)
+        val = (val >> 16) | ((word & 0xFFFF) << 240)
+
+    return val
+
+
+class Gost34311(object):
+    """Incremental GOST 34.311-95 hash"""
+
+    digest_size = 32
+    block_size = BLOCK_SIZE
+
+    def __init__(self, data=None, sbox=SBOX_DKE1):
+        self.sbox = sbox
+        self._tables = round_tables(sbox)
+        self._hash = 0
+        self._sum = 0
+        self._length = 0
+        self._tail = b''
+        if data is not None:
+            self.update(data)
+
+    def copy(self):
+        ret = Gost34311(sbox=self.sbox)
+        ret._hash = self._hash
+        ret._sum = self._sum
+        ret._length = self._length
+        ret._tail = self._tail
+        return ret
+
+    def update(self, data):
+        """Hash str, bytearray, memoryview or mmap without copying it"""
+        size = len(data)
+        pos = 0
+        if self._tail:
+            need = BLOCK_SIZE - len(self._tail)
+            self._tail += bytes(bytearray(data[:need]))
+            pos = min(need, size)
+            if len(self._tail) < BLOCK_SIZE:
+                return self
+
+            self._block(self._tail, 0)
+            self._tail = b''
+
+        end = pos + (size - pos) // BLOCK_SIZE * BLOCK_SIZE
+        block = self._block
+        for offset in xrange(pos, end, BLOCK_SIZE):
+            block(data, offset)
+
+        if end < size:
+            self._tail = bytes(bytearray(data[end:size]))
+
+        return self
+
+    def update_from(self, fobj, chunk_size=CHUNK_SIZE):
+        """Hash everything left in file object, reading it in chunks"""
+        while True:
+            chunk = fobj.read(chunk_size)
+            if not chunk:
+                return self
+
+            self.update(chunk)
+
+    def _block(self, data, offset):
+        q1, q2, q3, q4 = unpack_from('<4Q', data, offset)
+        val = q1 | (q2 << 64) | (q3 << 128) | (q4 << 192)
+        self._sum = (self._sum + val) & MASK256
+        self._length += BLOCK_SIZE * 8
+        self._hash = self._step(self._hash, val)
+
+    def _encrypt(self, key, block):
+        t1, t2, t3, t4 = self._tables
+        keys = [(key >> (32 * idx)) & MASK32 for idx in range(8)]
+        n1 = block & MASK32
+        n2 = block >> 32
+        for idx in KEY_ORDER:
+            val = (n1 + keys[idx]) & MASK32
+            n1, n2 = n2 ^ (
+                t1[val & 255] ^ t2[(val >> 8) & 255] ^
+                t3[(val >> 16) & 255] ^ t4[val >> 24]
+            ), n1
+
+        return n2 | (n1 << 32)
+
+    def _step(self, hin, msg):
+        encrypt = self._encrypt
+        u = hin
+        v = msg
+        keys = [transform_p(u ^ v)]
+        for const in (0, C3, 0):
+            u = transform_a(u) ^ const
+            v = transform_a(transform_a(v))
+            keys.append(transform_p(u ^ v))
+
+        val_s = 0
+        for idx, key in enumerate(keys):
+            part = (hin >> (64 * idx)) & MASK64
+            val_s |= encrypt(key, part) << (64 * idx)
+
+        val = transform_psi(val_s, 12) ^ msg
+        val = transform_psi(val, 1) ^ hin
+        return transform_psi(val, 61)
+
+    def digest(self):
+        ret = self._hash
+        total = self._sum
+        length = self._length
+        if self._tail:
+            padded = self._tail + b'\0' * (BLOCK_SIZE - len(self._tail))
+            val = long(hexlify(padded[::-1]), 16)
+            total = (total + val) & MASK256
+            length += len(self._tail) * 8
+            ret = self._step(ret, val)
+
+        ret = self._step(ret, length)
+        ret = self._step(ret, total)
+        return pack('<4Q', *[(ret >> (64 * idx)) & MASK64 for idx in range(4)])
+
+    def hexdigest(self):
+        return hexlify(self.digest())
+
+
+def hash_value(value, sbox=SBOX_DKE1):
+    """Hash str, buffer, mmap or file object in one pass"""
+    ctx = Gost34311(sbox=sbox)
+    if hasattr(value, 'read'):
+        return ctx.update_from(value)
+
+    return ctx.update(value)
@@ -1,40 +1,113 @@
 import random
+from binascii import unhexlify
 from . context import ldata
 
 
 bitl = long.bit_length
 
+HEX_DIGITS = '0123456789abcdef'
 
-class Field(object):
-    def __init__(self, v, raw=False):
-        if isinstance(v, int):
-            v = long(v)
+# Squaring in GF(2^m) inserts zero bit after every bit of value.
+# Table maps byte to its spread 16-bit form, written as four hex digits.
+SQR_TABLE = [
+    '%04x' % sum(((byte >> idx) & 1) << (idx * 2) for idx in range(8))
+    for byte in range(256)
+]
 
-        self.v = self.truncate(v) if raw else self.mod(v)
+# Shortest multi-squaring done through digit tables by inv_itoh(),
+# shorter runs are cheaper as plain squarings.
+ITOH_TABLE_MIN = 8
 
-    @classmethod
-    def mod(self, val):
-        modulus = ldata.modulus
 
-        if modulus == 0:
-            raise TypeError("Field class not configured")
+def digit_tables(basis):
+    """Tables of linear map given by images of 1, x, x^2 ...
+
+    Row i maps hex digit to combination of images of x^(4i) .. x^(4i+3),
+    so map of any value is XOR of one lookup per its hex digit.
+    """
+    basis = list(basis) + [0] * (-len(basis) % 4)
+    tables = []
+    for pos in xrange(0, len(basis), 4):
+        b1, b2, b4, b8 = basis[pos:pos + 4]
+        tables.append(dict(zip(HEX_DIGITS, (
+            0, b1, b2, b2 ^ b1,
+            b4, b4 ^ b1, b4 ^ b2, b4 ^ b2 ^ b1,
+            b8, b8 ^ b1, b8 ^ b2, b8 ^ b2 ^ b1,
+            b8 ^ b4, b8 ^ b4 ^ b1, b8 ^ b4 ^ b2, b8 ^ b4 ^ b2 ^ b1,
+        ))))
+
+    return tables
+
+
+def apply_tables(tables, val):
+    ret = 0
+    for table, digit in zip(tables, reversed('%x' % val)):
+        ret ^= table[digit]
+
+    return ret
+
+
+class FieldEngine(object):
+    """Arithmetic in GF(2^m) bound to one modulus.
+
+    Every domain owns one engine, created once with everything that
+    depends on modulus and order, so hot paths never look anything up
+    in thread-local context.
+    """
+
+    INV_METHODS = ('euclid', 'itoh')
+
+    # Fixed by frozen flag, mod and inv stay rebindable for Counters.
+    PARAMS = (
+        'param_m', 'nom_k', 'modulus', 'modulus_bits', 'order_bits',
+        'trace_mask', 'inv_chain',
+    )
+
+    def __init__(self, param_m, nom_k, order, inv='euclid'):
+        self.param_m = param_m
+        self.nom_k = tuple(nom_k)
+        self.modulus = long(Field.comp_modulus(param_m, *nom_k))
+        self.modulus_bits = bitl(self.modulus)
+        self.order_bits = bitl(long(order))
+
+        self.reduce = Field.comp_reduce(param_m, *nom_k)
+        if self.reduce is not None:
+            self.mod = self.reduce
+
+        self.trace_mask = Field.comp_trace_mask(param_m, *nom_k)
+        self.squad_tables = None
+
+        if inv not in self.INV_METHODS:
+            raise ValueError("Unknown inversion method {}".format(inv))
+
+        self.inv_chain = self.comp_inv_chain(param_m)
+        self.sqr_tables = {}
+        if inv == 'itoh':
+            self.inv = self.inv_itoh
+
+    def __setattr__(self, name, value):
+        if name in self.PARAMS and self.__dict__.get('_frozen'):
+            raise AttributeError("Field parameter {} is read-only".format(name))
+
+        object.__setattr__(self, name, value)
+
+    def mod(self, val):
+        modulus = self.modulus
 
         if val <= modulus:
             return val
 
         rv = val
-        bitm_l = bitl(modulus)
+        bitm_l = self.modulus_bits
         while bitl(rv) >= bitm_l:
             mask = modulus << (bitl(rv) - bitm_l)
             rv = rv ^ mask
 
         return rv
 
-    @classmethod
-    def truncate(cls, val, to_size=None):
+    def truncate(self, val, to_size=None):
         val = long(val)
-        domain = ldata.curve_domain
-        bitl_o = to_size if to_size else bitl(domain.order)
+        bitl_o = to_size if to_size else self.order_bits
         xbit = bitl(val)
         while bitl_o <= xbit:
             val = val ^ (1<<(xbit - 1))
@@ -42,181 +115,540 @@ class Field(object):
 
         return val
 
-    @classmethod
     def mul(self, val_a, val_b):
+        # 4-bit comb: all sixteen multiples of val_b are computed once,
+        # then val_a is consumed one hex digit at a time, highest first.
+        b1 = val_b
+        b2 = b1 << 1
+        b4 = b1 << 2
+        b8 = b1 << 3
+        comb = dict(zip(HEX_DIGITS, (
+            0, b1, b2, b2 ^ b1,
+            b4, b4 ^ b1, b4 ^ b2, b4 ^ b2 ^ b1,
+            b8, b8 ^ b1, b8 ^ b2, b8 ^ b2 ^ b1,
+            b8 ^ b4, b8 ^ b4 ^ b1, b8 ^ b4 ^ b2, b8 ^ b4 ^ b2 ^ b1,
+        )))
+
         val_c = 0
-        for j in xrange(bitl(val_a)):
-            if val_a & (1<<j):
-                val_c = val_c ^ val_b
-            val_b = val_b << 1
+        for digit in '%x' % val_a:
+            val_c = (val_c << 4) ^ comb[digit]
 
         return self.mod(val_c)
 
-    @classmethod
-    def add(self, val_a, val_b):
+    def sqr(self, val):
+        data = '%x' % val
+        if len(data) & 1:
+            data = '0' + data
+
+        spread = map(SQR_TABLE.__getitem__, bytearray(unhexlify(data)))
+        return self.mod(int(''.join(spread), 16))
+
+    def sqr_n(self, val, count):
+        sqr = self.sqr
+        for idx in xrange(count):
+            val = sqr(val)
+
+        return val
+
+    @staticmethod
+    def add(val_a, val_b):
         return val_a ^ val_b
 
-    @classmethod
-    def inv(cls, val_a):
-        modulus = ldata.modulus
+    def inv(self, val_a):
+        """Binary extended Euclid, default inversion on every curve"""
         b = 1
         c = 0
-        u = cls.mod(val_a)
-        v = modulus
+        u = long(self.mod(val_a))
+        if not u:
+            raise ValueError("Zero has no inverse")
 
-        while bitl(u) > 1:
-            j = bitl(u) - bitl(v)
+        v = self.modulus
+        bits_u = bitl(u)
+        bits_v = self.modulus_bits
+
+        while bits_u > 1:
+            j = bits_u - bits_v
             if j < 0:
                 u, v = v, u
                 c, b = b, c
+                bits_u, bits_v = bits_v, bits_u
                 j = -j
 
-            u = cls.add(u, v << j)
-            b = cls.add(b, c << j)
-         
+            u = u ^ (v << j)
+            b = b ^ (c << j)
+            bits_u = bitl(u)
+
         return b
 
-    @classmethod
-    def trace(cls, val):
-        modulus = ldata.modulus
+    inv_euclid = inv
+
+    @staticmethod
+    def comp_inv_chain(param_m):
+        """Addition chain for m - 1 as ('double', k) and ('one', k) steps"""
+        steps = []
+        count = 1
+        for bit in bin(param_m - 1)[3:]:
+            steps.append(('double', count))
+            count *= 2
+            if bit == '1':
+                steps.append(('one', count))
+                count += 1
+
+        return steps
+
+    def inv_itoh(self, val_a):
+        """Itoh-Tsujii inversion, a^-1 = (a^(2^(m-1) - 1))^2.
+
+        b_k = a^(2^k - 1) is built along addition chain for m - 1
+        with b_2k = b_k^(2^k) * b_k and b_k+1 = b_k^2 * a.
+        Long runs of squarings go through digit tables of map
+        x -> x^(2^k), built on first use.
+        """
+        mul = self.mul
+        sqr = self.sqr
+        val_a = self.mod(long(val_a))
+        if not val_a:
+            raise ValueError("Zero has no inverse")
+
+        val_b = val_a
+        for step, count in self.inv_chain:
+            if step == 'one':
+                val_b = mul(sqr(val_b), val_a)
+                continue
+
+            if count < ITOH_TABLE_MIN:
+                val_t = self.sqr_n(val_b, count)
+            else:
+                val_t = apply_tables(self.multi_sqr_tables(count), val_b)
 
-        rv = long(val)
-        bitm_l = bitl(modulus)
-        for idx in range(1, bitm_l-1):
-            rv = long(rv)
-            rv = cls.mul(rv, rv)
-            rv = rv ^ val
+            val_b = mul(val_t, val_b)
 
-        return rv
+        return sqr(val_b)
 
-    @classmethod
-    def squad(cls, val):
-        modulus = ldata.modulus
+    def multi_sqr_tables(self, count):
+        """Digit tables of x -> x^(2^count), images of x^i are powers of x^(2^count)"""
+        tables = self.sqr_tables.get(count)
+        if tables is None:
+            step = self.sqr_n(long(2), count)
+            basis = [long(1)]
+            for idx in xrange(1, self.param_m):
+                basis.append(self.mul(basis[-1], step))
 
-        if modulus & 1:
-            ret = cls.squad_odd(val)
-        else:
-            ret = cls.squad_even(val)
+            tables = self.sqr_tables[count] = digit_tables(basis)
 
-        return cls.mod(ret)
+        return tables
 
-    @classmethod
-    def squad_odd(cls, val):
-        val_a = cls.mod(val)
+    def batch_inv(self, values):
+        """Invert many elements with one inv() and 3(n - 1) mul().
+
+        Montgomery trick: product of all values is inverted once, then
+        every inverse is peeled off it. Zero has no inverse and stays zero.
+        """
+        mul = self.mul
+        values = list(values)
+        ret = [0] * len(values)
+
+        prefix = []
+        acc = None
+        for val in values:
+            prefix.append(acc)
+            if val:
+                acc = val if acc is None else mul(acc, val)
+
+        if acc is None:
+            return ret
+
+        acc_inv = self.inv(acc)
+        for pos in xrange(len(values) - 1, -1, -1):
+            val = values[pos]
+            if not val:
+                continue
+
+            if prefix[pos] is None:
+                ret[pos] = acc_inv
+                break
+
+            ret[pos] = mul(acc_inv, prefix[pos])
+            acc_inv = mul(acc_inv, val)
+
+        return ret
+
+    def trace(self, val):
+        if val >> self.param_m:
+            val = self.mod(val)
+
+        return bin(val & self.trace_mask).count('1') & 1
+
+    def squad(self, val):
+        """Solve z^2 + z = val, raise ValueError when there is no solution.
+
+        Solution is linear in val, so it is looked up one hex digit
+        at a time in tables built on first use, see comp_squad_tables().
+        Works for both odd and even m.
+        """
+        if val >> self.param_m:
+            val = self.mod(val)
+
+        if self.trace(val):
+            raise ValueError("Equation has no solution")
+
+        tables = self.squad_tables
+        if tables is None:
+            tables = self.squad_tables = self.comp_squad_tables()
+
+        return apply_tables(tables, val)
+
+    def comp_squad_tables(self):
+        """Build per-digit tables of linear solver for z^2 + z = a.
+
+        Map z -> z^2 + z is linear with kernel {0, 1} and its image
+        holds all elements with zero trace. It is inverted on
+        x, x^2 .. x^(m-1) by elimination over GF(2), and every basis
+        element x^i gets solution of x^i + Tr(x^i) * u, where u has
+        trace one. For odd m u is 1 and solution is half-trace of x^i
+        up to constant 1. Combination of these for any a with Tr(a) = 0
+        solves the equation.
+        """
+        param_m = self.param_m
+        one = long(1)
+
+        pivots = {}
+        for idx in xrange(1, param_m):
+            vec = self.mod(one << (idx * 2)) ^ (one << idx)
+            comb = one << idx
+            while True:
+                if not vec:
+                    raise ValueError("Modulus is not irreducible")
+
+                top = bitl(vec) - 1
+                pivot = pivots.get(top)
+                if pivot is None:
+                    pivots[top] = (vec, comb)
+                    break
+
+                vec ^= pivot[0]
+                comb ^= pivot[1]
+
+        mask = self.trace_mask
+        unit = mask & -mask
+        basis = []
+        for idx in xrange(param_m):
+            vec = one << idx
+            if (mask >> idx) & 1:
+                vec ^= unit
+
+            ret = 0
+            while vec:
+                pivot_vec, comb = pivots[bitl(vec) - 1]
+                vec ^= pivot_vec
+                ret ^= comb
+
+            basis.append(ret)
+
+        return digit_tables(basis)
+
+    def squad_odd(self, val):
+        """Half-trace solution of z^2 + z = val for odd m, without tables"""
+        val_a = self.mod(val)
         val_z = val_a
 
-        for idx in range(1, ((cls.p0-1)/2) + 1):
-            val_z = cls.mul(val_z, val_z)
-            val_z = cls.mul(val_z, val_z)
-            val_z = cls.add(val_z, val_a)
+        for idx in range(1, ((self.param_m-1)/2) + 1):
+            val_z = self.sqr_n(val_z, 2)
+            val_z = val_z ^ val_a
 
-        val_w = cls.mul(val_z, val_z)
-        val_w = cls.add(val_z, val_w)
+        val_w = self.sqr(val_z)
+        val_w = val_z ^ val_w
 
-        assert val_w == val_a
+        if val_w != val_a:
+            raise ValueError("Equation has no solution")
 
         return val_z
 
+
+class Field(object):
+    """Field element and thin wrappers over FieldEngine of current curve().
+
+    Code that holds domain should call domain.field directly instead.
+    """
+
+    def __init__(self, v, raw=False, field=None):
+        if isinstance(v, int):
+            v = long(v)
+
+        if field is None:
+            field = ldata.field
+
+        self.v = field.truncate(v) if raw else field.mod(v)
+
+    @classmethod
+    def mod(cls, val):
+        return ldata.field.mod(val)
+
+    @classmethod
+    def truncate(cls, val, to_size=None):
+        return ldata.field.truncate(val, to_size)
+
+    @classmethod
+    def mul(cls, val_a, val_b):
+        return ldata.field.mul(val_a, val_b)
+
+    @classmethod
+    def sqr(cls, val):
+        return ldata.field.sqr(val)
+
+    @classmethod
+    def sqr_n(cls, val, count):
+        return ldata.field.sqr_n(val, count)
+
+    @classmethod
+    def add(cls, val_a, val_b):
+        return val_a ^ val_b
+
     @classmethod
-    def squad_eve(cls, val):
-        raise ValueError("Not implemented")
+    def inv(cls, val_a):
+        return ldata.field.inv(val_a)
+
+    @classmethod
+    def batch_inv(cls, values):
+        return ldata.field.batch_inv(values)
+
+    @classmethod
+    def trace(cls, val):
+        return ldata.field.trace(val)
+
+    @classmethod
+    def squad(cls, val):
+        return ldata.field.squad(val)
+
+    @classmethod
+    def squad_odd(cls, val):
+        return ldata.field.squad_odd(val)
 
     @classmethod
     def comp_modulus(cls, *kbits):
-        cls.p0 = max(kbits)
         modulus = 0
         for kbit in kbits:
             modulus |= 1<<kbit
 
         return modulus
 
+    @classmethod
+    def comp_reduce(cls, param_m, *kbits):
+        """Build fast reduction for sparse modulus x^m + x^k1 + ... + 1.
+
+        High part of value is folded back by shifting it by every
+        low exponent, which takes two or three passes for a double-width
+        product. Returns None when modulus is not sparse enough
+        for folding to pay off, so Field.mod falls back to bitwise loop.
+        """
+        kbits = sorted(set(kbits) - set([param_m]))
+        if not kbits or kbits[0] != 0 or kbits[-1] > param_m // 2:
+            return None
+
+        shifts = tuple(kbits[1:])
+        mask = (1 << param_m) - 1
+
+        def reduce(val):
+            high = val >> param_m
+            while high:
+                val = (val & mask) ^ high
+                for shift in shifts:
+                    val ^= high << shift
+                high = val >> param_m
+
+            return val
+
+        return reduce
+
+    @classmethod
+    def comp_trace_mask(cls, param_m, *kbits):
+        """Build mask that has bit i set when Tr(x^i) is one.
+
+        Trace is linear, so Tr(a) is parity of a & mask. Traces of
+        powers of x are power sums of roots of modulus and follow
+        from its coefficients by Newton identities, without any
+        field multiplication.
+        """
+        steps = [param_m - kbit for kbit in set(kbits) if kbit != param_m]
+        traces = [param_m & 1]
+        for idx in xrange(1, param_m):
+            bit = 0
+            for step in steps:
+                if step < idx:
+                    bit ^= traces[idx - step]
+                elif step == idx:
+                    bit ^= idx & 1
+            traces.append(bit)
+
+        mask = 0
+        for idx, bit in enumerate(traces):
+            mask |= bit << idx
+
+        return mask
+
     def __eq__(self, other):
         return long.__cmp__(self.v,  other.v) == 0
 
 
+class Coord(object):
+    """Coordinate of Point seen as Field element.
+
+    Points keep plain integers, this view keeps point.x.v and
+    point.y.v working, including assignment.
+    """
+
+    __slots__ = ('point', 'attr')
+
+    def __init__(self, point, attr):
+        self.point = point
+        self.attr = attr
+
+    @property
+    def v(self):
+        return getattr(self.point, self.attr)
+
+    @v.setter
+    def v(self, value):
+        setattr(self.point, self.attr, value)
+
+    def __eq__(self, other):
+        return self.v == other.v
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _coord(attr):
+    def get(self):
+        return Coord(self, attr)
+
+    def set(self, value):
+        setattr(self, attr, value.v)
+
+    return property(get, set)
+
+
 class Point(object):
+    """Affine point, coordinates are plain integers in xv and yv"""
+
     FORMAT_UNCOMPRESSED = '\x04'
 
-    def __init__(self, x, y, raw=False):
-        self.x = Field(x, raw=raw)
-        self.y = Field(y, raw=raw)
+    __slots__ = ('curve', 'xv', 'yv')
+
+    def __init__(self, x, y, raw=False, curve=None):
+        if curve is None:
+            curve = ldata.curve
+
+        field = curve.field
+        conv = field.truncate if raw else field.mod
+        self.curve = curve
+        self.xv = conv(long(x))
+        self.yv = conv(long(y))
 
     @classmethod
-    def expand(cls, val):
+    def from_coords(cls, x, y, curve):
+        """Build point from already reduced coordinates"""
+        point = cls.__new__(cls)
+        point.curve = curve
+        point.xv = x
+        point.yv = y
+        return point
 
-        pb = ldata.curve.field_b
-        pa = ldata.curve.field_a
+    x = _coord('xv')
+    y = _coord('yv')
 
-        if val == 0:
-            return val, Field.mul(pb, pb)
+    @classmethod
+    def expand(cls, val, curve=None):
+        return cls.expand_many([val], curve=curve)[0]
 
-        valmask = (1<<ldata.curve_domain.param_m) - 1
-        k = val & 1
-        val = (valmask-1) & val
+    @classmethod
+    def expand_many(cls, values, curve=None):
+        """Decompress many points sharing single field inversion"""
+        if curve is None:
+            curve = ldata.curve
 
-        trace = Field.trace(val)
+        field = curve.field
+        pb = curve.field_b
+        pa = curve.field_a
 
-        if (trace and pa == 0) or (not trace and pa == 1):
-            val = val | 1
+        valmask = (1<<field.param_m) - 1
 
-        x2 = Field.mul(val, val)
+        parts = []
+        for val in values:
+            if val == 0:
+                parts.append(None)
+                continue
 
-        y = Field.mul(x2, val)
+            k = val & 1
+            val = (valmask-1) & val
 
-        if pa == 1:
-            y = Field.add(y, x2)
+            trace = field.trace(val)
 
-        y = Field.add(y, pb)
-        x2 = Field.inv(x2)
+            if (trace and pa == 0) or (not trace and pa == 1):
+                val = val | 1
 
-        y = Field.mul(y, x2)
+            parts.append((k, val, field.sqr(val)))
 
-        y = Field.squad(y)
+        x2_invs = iter(field.batch_inv([part[2] for part in parts if part]))
 
-        trace_y = Field.trace(y)
+        ret = []
+        for part in parts:
+            if part is None:
+                ret.append((0, field.sqr(pb)))
+                continue
 
-        if (k and not trace_y) or (not k and trace_y):
-            y = y ^ 1
+            k, val, x2 = part
 
-        y = Field.mul(y, val)
-        return val, y
+            y = field.mul(x2, val)
 
-    @classmethod
-    def decode(cls, data, in_hex=True):
-        if in_hex:
-            data = data.decode('hex')
+            if pa == 1:
+                y = field.add(y, x2)
 
-        sz = len(data) - 1
-        hsz = sz / 2
-        code, data_x, data_y = data[0], data[1:hsz+1], data[hsz+1:]
+            y = field.add(y, pb)
 
-        if code[0] == cls.FORMAT_UNCOMPRESSED:
-            point_x = int(data_x.encode('hex'), 16)
-            point_y =  int(data_y.encode('hex'), 16)
+            y = field.mul(y, next(x2_invs))
 
-            return cls(point_x, point_y)
+            y = field.squad(y)
+
+            trace_y = field.trace(y)
+
+            if (k and not trace_y) or (not k and trace_y):
+                y = y ^ 1
+
+            y = field.mul(y, val)
+            ret.append((val, y))
+
+        return ret
+
+    @classmethod
+    def decode(cls, data, in_hex=True, curve=None):
+        """Decode compressed or uncompressed point, see codec module"""
+        if in_hex:
+            data = unhexlify(data)
 
-        raise ValueError("Only uncompressed points supported")
+        return codec.decode(data, curve)
 
     def compress(self):
-        if self.x.v == 0:
+        x = self.xv
+        if x == 0:
             raise ValueError("Can't compress infinity")
 
-        x_inv = Field.inv(self.x.v)
-        y = Field.mul(x_inv, self.y.v)
-        y_trace = Field.trace(y)
+        field = self.curve.field
+        x_inv = field.inv(x)
+        y = field.mul(x_inv, self.yv)
+        y_trace = field.trace(y)
         if y_trace:
-            return self.x.v | 1
+            return x | 1
 
-        return self.x.v ^ (self.x.v & 1)
+        return x ^ (x & 1)
 
     def add(self, point_1):
-        a = ldata.curve.field_a
-
-        x0, y0 = self.x.v, self.y.v
-        x1, y1 = point_1.x.v, point_1.y.v
+        curve = self.curve
+        field = curve.field
+        a = curve.field_a
 
-        point_2 = Point(0, 0)
+        x0, y0 = self.xv, self.yv
+        x1, y1 = point_1.xv, point_1.yv
 
         if self.is_zero():
             return point_1
@@ -225,75 +657,497 @@ class Point(object):
             return self
 
         if x0 != x1:
-            lbd = Field.mul(
-                Field.add(y0, y1),
-                Field.inv(Field.add(x0, x1))
+            lbd = field.mul(
+                field.add(y0, y1),
+                field.inv(field.add(x0, x1))
             )
-            x2 = Field.add(a, Field.mul(lbd, lbd))
-            x2 = Field.add(x2, lbd)
-            x2 = Field.add(x2, x0)
-            x2 = Field.add(x2, x1)
-
-        elif y0 != y1:
-            return point_2
-        elif x1 == 0:
-            return point_2
-        else:
-            lbd = Field.add(x1, Field.mul(y1, Field.inv(x1)))
-            x2 = Field.add(a, Field.mul(lbd, lbd))
-            x2 = Field.add(x2, lbd)
+            x2 = field.add(a, field.sqr(lbd))
+            x2 = field.add(x2, lbd)
+            x2 = field.add(x2, x0)
+            x2 = field.add(x2, x1)
 
-        y2 = Field.mul(Field.add(x1, x2), lbd)
-        y2 = Field.add(y2, x2)
-        y2 = Field.add(y2, y1)
+        elif y0 != y1 or x1 == 0:
+            return Point.from_coords(0, 0, curve)
+        else:
+            lbd = field.add(x1, field.mul(y1, field.inv(x1)))
+            x2 = field.add(a, field.sqr(lbd))
+            x2 = field.add(x2, lbd)
 
-        point_2.x.v = x2
-        point_2.y.v = y2
+        y2 = field.mul(field.add(x1, x2), lbd)
+        y2 = field.add(y2, x2)
+        y2 = field.add(y2, y1)
 
-        return point_2
+        return Point.from_coords(x2, y2, curve)
 
     __add__ = add
 
     def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+        return self.xv == other.xv and self.yv == other.yv
+
+    def __ne__(self, other):
+        return not self == other
 
     def negate(self):
-        ret = Point(0, 0)
-        ret.x.v = self.x.v
-        ret.y.v = Field.add(self.y.v, self.x.v)
-        return ret
+        return Point.from_coords(self.xv, self.yv ^ self.xv, self.curve)
+
+    def mul_proj(self, param_n):
+        width = OddMultiples.width_for(bitl(abs(long(param_n))))
+        return OddMultiples(self, width).mul_proj(param_n)
 
     def mul(self, param_n):
-        if param_n == 0:
-            raise Point(0, 0)
+        return self.mul_proj(param_n).to_affine()
 
-        if param_n < 0:
-            param_n = long(-param_n)
-            point = self.negate()
-        else:
-            param_n = long(param_n)
-            point = self
-
-        point_r0 = Point(0, 0)
-        point_r1 = point
-        for j in xrange(bitl(param_n) - 1, -1, -1):
-            if param_n & (1<<j):
-                point_r0 = point_r0 + point_r1
-                point_r1 = point_r1 + point_r1
+    __mul__ = mul
+
+    def mul_x(self, param_n):
+        """Compute only X coordinate of n * P.
+
+        Lopez-Dahab x-only Montgomery ladder keeps (X1 : Z1) and
+        (X2 : Z2) for R and R + P, never touching Y.
+        Returns None when result is infinity.
+        """
+        param_n = abs(long(param_n))
+        x = self.xv
+        if param_n == 0 or self.is_zero():
+            return None
+
+        if x == 0:
+            return x if param_n & 1 else None
+
+        field = self.curve.field
+        pb = self.curve.field_b
+        step = self._ladder_step
+
+        x1, z1 = x, 1
+        z2 = field.sqr(x)
+        x2 = field.add(field.sqr(z2), pb)
+
+        for bit in bin(param_n)[3:]:
+            if bit == '1':
+                x1, z1, x2, z2 = step(field, x, x2, z2, x1, z1, pb)
             else:
-                point_r1 = point_r0 + point_r1
-                point_r0 = point_r0 + point_r0
+                x2, z2, x1, z1 = step(field, x, x1, z1, x2, z2, pb)
 
-        return point_r0
+        if z1 == 0:
+            return None
 
-    __mul__ = mul
+        return field.mul(x1, field.inv(z1))
+
+    @staticmethod
+    def _ladder_step(field, x, x1, z1, x2, z2, pb):
+        """Return (X1 : Z1) + (X2 : Z2) and 2 * (X1 : Z1)"""
+        mul = field.mul
+        sqr = field.sqr
+
+        t1 = mul(x1, z2)
+        t2 = mul(x2, z1)
+        z_add = sqr(t1 ^ t2)
+        x_add = mul(x, z_add) ^ mul(t1, t2)
+
+        x1s = sqr(x1)
+        z1s = sqr(z1)
+        x_dbl = sqr(x1s) ^ mul(pb, sqr(z1s))
+        z_dbl = mul(x1s, z1s)
+
+        return x_add, z_add, x_dbl, z_dbl
+
+    @classmethod
+    def mul2(cls, param_k1, point_1, param_k2, point_2):
+        """Compute k1 * P1 + k2 * P2 with one shared doubling chain.
+
+        Both scalars are recoded to width-w NAF and their digits are
+        interleaved over single run of doublings. Either point can be
+        passed as prebuilt OddMultiples table.
+        Result is returned in projective coordinates.
+        """
+        tables = []
+        for param_n, point in ((param_k1, point_1), (param_k2, point_2)):
+            if not isinstance(point, OddMultiples):
+                width = OddMultiples.width_for(bitl(abs(long(param_n))))
+                point = OddMultiples(point, width)
+
+            tables.append((point, param_n))
+
+        return OddMultiples.mul_interleaved(tables)
+
+    def is_zero(self):
+        return self.xv == 0 and self.yv == 0
+
+    infinity = property(is_zero)
+
+    def __repr__(self):
+        return '<Point X:{:x} Y:{:x}>'.format(self.xv, self.yv)
+
+
+class FrozenPoint(Point):
+    """Point that rejects any change, base point of shared domain is one"""
+
+    __slots__ = ()
+
+    def __init__(self, x, y, raw=False, curve=None):
+        point = Point(x, y, raw, curve)
+        for attr in Point.__slots__:
+            object.__setattr__(self, attr, getattr(point, attr))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Point is immutable")
+
+
+class ProjPoint(object):
+    """Point in Lopez-Dahab projective coordinates.
+
+    Affine point is (X / Z, Y / Z^2), infinity has Z == 0.
+    None of the operations below need field inversion,
+    only to_affine() does.
+    idouble() and iadd_mixed() update point in place, for use
+    as accumulator in ladders and window loops.
+    """
+
+    __slots__ = ('x', 'y', 'z', 'curve')
+
+    def __init__(self, x, y, z, curve=None):
+        if curve is None:
+            curve = ldata.curve
+
+        self.x = x
+        self.y = y
+        self.z = z
+        self.curve = curve
+
+    @classmethod
+    def from_affine(cls, point):
+        if point.is_zero():
+            return cls(1, 0, 0, point.curve)
+
+        return cls(point.xv, point.yv, 1, point.curve)
+
+    def to_affine(self):
+        if self.z == 0:
+            return Point.from_coords(0, 0, self.curve)
+
+        field = self.curve.field
+        z_inv = field.inv(self.z)
+        x = field.mul(self.x, z_inv)
+        y = field.mul(self.y, field.sqr(z_inv))
+        return Point.from_coords(x, y, self.curve)
+
+    @staticmethod
+    def batch_to_affine(points):
+        """Convert many points to affine sharing single field inversion"""
+        if not points:
+            return []
+
+        curve = points[0].curve
+        field = curve.field
+        z_invs = field.batch_inv([point.z for point in points])
+
+        ret = []
+        for point, z_inv in zip(points, z_invs):
+            if point.z == 0:
+                ret.append(Point.from_coords(0, 0, curve))
+                continue
+
+            x = field.mul(point.x, z_inv)
+            y = field.mul(point.y, field.sqr(z_inv))
+            ret.append(Point.from_coords(x, y, curve))
+
+        return ret
+
+    def double(self):
+        x3, y3, z3 = self._double(self.x, self.y, self.z)
+        return ProjPoint(x3, y3, z3, self.curve)
+
+    def idouble(self):
+        self.x, self.y, self.z = self._double(self.x, self.y, self.z)
+        return self
+
+    def _double(self, x1, y1, z1):
+        if z1 == 0 or x1 == 0:
+            return 1, 0, 0
+
+        curve = self.curve
+
+        field = curve.field
+        mul = field.mul
+        sqr = field.sqr
+
+        x1s = sqr(x1)
+        z1s = sqr(z1)
+        bz4 = mul(curve.field_b, sqr(z1s))
+
+        z3 = mul(x1s, z1s)
+        x3 = sqr(x1s) ^ bz4
+
+        t = sqr(y1) ^ bz4
+        if curve.field_a:
+            t = t ^ mul(curve.field_a, z3)
+
+        y3 = mul(bz4, z3) ^ mul(x3, t)
+        return x3, y3, z3
+
+    def add_mixed(self, point):
+        """Add affine point, cheaper than add() of two projective ones"""
+        if point.is_zero():
+            return self
+
+        x3, y3, z3 = self._add_mixed(point)
+        return ProjPoint(x3, y3, z3, self.curve)
+
+    def iadd_mixed(self, point):
+        if not point.is_zero():
+            self.x, self.y, self.z = self._add_mixed(point)
+
+        return self
+
+    def _add_mixed(self, point):
+        x2, y2 = point.xv, point.yv
+        if self.z == 0:
+            return x2, y2, 1
+
+        curve = self.curve
+        field = curve.field
+        mul = field.mul
+        sqr = field.sqr
+
+        a = curve.field_a
+        x1, y1, z1 = self.x, self.y, self.z
+
+        pa = y1 ^ mul(y2, sqr(z1))
+        pb = x1 ^ mul(x2, z1)
+
+        if pb == 0:
+            if pa == 0:
+                return self._double(x2, y2, 1)
+
+            return 1, 0, 0
+
+        pc = mul(pb, z1)
+        z3 = sqr(pc)
+        pd = mul(x2, z3)
+
+        t = pa ^ sqr(pb)
+        if a:
+            t = t ^ mul(a, pc)
+
+        x3 = sqr(pa) ^ mul(pc, t)
+
+        y3 = mul(pd ^ x3, mul(pa, pc) ^ z3)
+        y3 = y3 ^ mul(y2 ^ x2, sqr(z3))
+
+        return x3, y3, z3
+
+    def add(self, other):
+        if other.z == 0:
+            return self
+
+        if self.z == 0:
+            return other
+
+        curve = self.curve
+        field = curve.field
+        mul = field.mul
+        sqr = field.sqr
+
+        a = curve.field_a
+        x1, y1, z1 = self.x, self.y, self.z
+        x2, y2, z2 = other.x, other.y, other.z
+
+        pa = mul(x1, z2)
+        pb = mul(x2, z1)
+        pe = pa ^ pb
+        pi = mul(y1, sqr(z2)) ^ mul(y2, sqr(z1))
+
+        if pe == 0:
+            if pi == 0:
+                return self.double()
+
+            return ProjPoint(1, 0, 0, curve)
+
+        pc = mul(pe, mul(z1, z2))
+        z3 = sqr(pc)
+
+        t = pi ^ sqr(pe)
+        if a:
+            t = t ^ mul(a, pc)
+
+        x3 = sqr(pi) ^ mul(pc, t)
+
+        # x2 * Z3 and y2 * Z3^2 expressed through X2, Y2 without division
+        pk = mul(pe, pc)
+        pd = mul(pb, pk)
+        y3 = mul(pd ^ x3, mul(pi, pc) ^ z3)
+        y3 = y3 ^ mul(pd, z3)
+        y3 = y3 ^ mul(mul(y2, sqr(z1)), sqr(pk))
+
+        return ProjPoint(x3, y3, z3, curve)
+
+    __add__ = add
 
     def is_zero(self):
-        return (self.x.v == 0) and (self.y.v == 0)
+        return self.z == 0
 
     infinity = property(is_zero)
 
     def __repr__(self):
-        return '<Point X:{:x} Y:{:x}>'.format(self.x.v, self.y.v)
+        return '<ProjPoint X:{:x} Y:{:x} Z:{:x}>'.format(self.x, self.y, self.z)
+
 
+class FixedBase(object):
+    """Precomputed multiples of point for fixed-base multiplication.
+
+    Row i of table holds j * 16^i * P for every hex digit j, so
+    multiplication is one mixed addition per non-zero hex digit
+    of scalar and no doublings at all.
+    """
+
+    def __init__(self, point, bits):
+        self.point = point
+        self.curve = point.curve
+        self.bits = bits
+        self.table = []
+
+        infinity = Point.from_coords(0, 0, self.curve)
+        row_base = point
+        for idx in xrange((bits + 3) // 4):
+            row = [ProjPoint.from_affine(row_base)]
+            for digit in xrange(2, 16):
+                row.append(row[-1].add_mixed(row_base))
+
+            row.append(row[7].double())
+            row = ProjPoint.batch_to_affine(row)
+
+            row_base = row.pop()
+            self.table.append(dict(zip(HEX_DIGITS, [infinity] + row)))
+
+    @classmethod
+    def from_rows(cls, point, bits, rows):
+        """Table from rows of fifteen affine points for digits 1 .. f"""
+        ret = cls.__new__(cls)
+        ret.point = point
+        ret.curve = point.curve
+        ret.bits = bits
+
+        infinity = Point.from_coords(0, 0, point.curve)
+        ret.table = [dict(zip(HEX_DIGITS, [infinity] + list(row))) for row in rows]
+        return ret
+
+    def mul_proj(self, param_n):
+        if param_n < 0 or bitl(long(param_n)) > self.bits:
+            return self.point.mul_proj(param_n)
+
+        point_r = ProjPoint(1, 0, 0, self.curve)
+        for row, digit in zip(self.table, reversed('%x' % param_n)):
+            if digit != '0':
+                point_r.iadd_mixed(row[digit])
+
+        return point_r
+
+    def mul(self, param_n):
+        return self.mul_proj(param_n).to_affine()
+
+    __mul__ = mul
+
+
+def wnaf(param_n, width):
+    """Width-w non-adjacent form of n, lowest digit first.
+
+    Every non-zero digit is odd, below 2^(w-1) by absolute value
+    and followed by at least w - 1 zeros.
+    """
+    param_n = long(param_n)
+    sign = 1
+    if param_n < 0:
+        param_n, sign = -param_n, -1
+
+    full = 1 << width
+    half = full >> 1
+
+    digits = []
+    while param_n:
+        zeros = bitl(param_n & -param_n) - 1
+        if zeros:
+            digits.extend([0] * zeros)
+            param_n >>= zeros
+
+        digit = param_n & (full - 1)
+        if digit >= half:
+            digit -= full
+
+        digits.append(digit * sign)
+        param_n = (param_n - digit) >> 1
+
+    return digits
+
+
+class OddMultiples(object):
+    """Odd multiples P, 3P, ..., (2^(w-1) - 1) P for width-w NAF.
+
+    Negative digits use negated points, which are nearly free
+    on binary curves.
+    """
+
+    def __init__(self, point, width):
+        self.point = point
+        self.curve = point.curve
+        self.width = width
+
+        point_2 = point + point
+        chain = [ProjPoint.from_affine(point)]
+        for idx in xrange((1 << (width - 2)) - 1):
+            chain.append(chain[-1].add_mixed(point_2))
+
+        table = ProjPoint.batch_to_affine(chain)
+
+        self.table = table
+        self.negated = [pt.negate() for pt in table]
+
+    @classmethod
+    def from_table(cls, point, width, table):
+        ret = cls.__new__(cls)
+        ret.point = point
+        ret.curve = point.curve
+        ret.width = width
+        ret.table = list(table)
+        ret.negated = [pt.negate() for pt in ret.table]
+        return ret
+
+    @staticmethod
+    def width_for(bits):
+        # Every extra bit of width doubles the table, built with
+        # mixed additions, and saves m / (w + 1) - m / (w + 2)
+        # mixed additions in the chain. Break-even is around 300 bits.
+        return 4 if bits < 300 else 5
+
+    def mul_proj(self, param_n):
+        return self.mul_interleaved([(self, param_n)])
+
+    def mul(self, param_n):
+        return self.mul_proj(param_n).to_affine()
+
+    __mul__ = mul
 
+    @staticmethod
+    def mul_interleaved(pairs):
+        """Sum of n * P for (OddMultiples, n) pairs over shared doublings"""
+        chains = [
+            (table.table, table.negated, wnaf(param_n, table.width))
+            for table, param_n in pairs
+        ]
+        length = max(len(digits) for _, _, digits in chains)
+
+        point_r = ProjPoint(1, 0, 0, pairs[0][0].curve)
+        for pos in xrange(length - 1, -1, -1):
+            point_r.idouble()
+            for table, negated, digits in chains:
+                if pos >= len(digits):
+                    continue
+
+                digit = digits[pos]
+                if digit > 0:
+                    point_r.iadd_mixed(table[digit >> 1])
+                elif digit < 0:
+                    point_r.iadd_mixed(negated[-digit >> 1])
+
+        return point_r
+
+from . import codec
@@ -0,0 +1,188 @@
+"""Sign, verify and key agreement over pool of worker processes.
+
+Arithmetic is pure python and holds GIL, so threads do not help.
+Jobs are sent to workers as plain integers, every worker builds its
+domains and base point tables once when started, unless they were
+loaded from table file before fork.
+"""
+import multiprocessing
+import sys
+
+from .context import StandardDomain
+from .crypto import Priv, Pubkey, SignatureError
+from .tables import load as load_tables
+
+
+CURVES = ('DSTU_163', 'DSTU_257', 'DSTU_431')
+
+# Worker-local domains, filled by _init() once per process.
+_domains = {}
+
+
+def _init(names, tables=None):
+    if tables is not None:
+        load_tables(tables, names)
+
+    for name in names:
+        domain = StandardDomain.get(name)
+        domain.base_table
+        domain.base_wnaf
+        _domains[name] = domain
+
+
+def _domain(name):
+    domain = _domains.get(name)
+    if domain is None:
+        _init([name])
+        domain = _domains[name]
+
+    return domain
+
+
+def _sign(job):
+    name, param_d, value_hash = job
+    domain = _domain(name)
+    return domain.sign(Priv(param_d), value_hash)
+
+
+def _verify(job):
+    name, (x, y), value_hash, s, r = job
+    domain = _domain(name)
+    pub = Pubkey(domain.point(x, y))
+    try:
+        return domain.verify(pub, value_hash, s, r)
+    except SignatureError:
+        return False
+
+
+def _agree(job):
+    name, param_d, (x, y), cofactor = job
+    domain = _domain(name)
+    pub = Pubkey(domain.point(x, y))
+    try:
+        return domain.agree(Priv(param_d), pub, cofactor)
+    except ValueError:
+        return None
+
+
+def _point(pubkey):
+    return pubkey.point.xv, pubkey.point.yv
+
+
+class Pool(object):
+    """Process pool for DSTU 4145 operations.
+
+    Every method takes curve name and iterable of jobs and returns
+    list of results in the same order. imap_* variants return iterator
+    that yields results as soon as they are ready, still in order.
+    Jobs are sent to workers in chunks of chunksize. tables is path
+    to file written by tables.dump(). It is loaded here before workers
+    are forked, so they share decoded tables copy-on-write instead of
+    building or loading their own.
+    """
+
+    def __init__(self, processes=None, curves=CURVES, chunksize=8, tables=None):
+        self.chunksize = chunksize
+        if tables is not None:
+            load_tables(tables, curves)
+
+        # Workers that are not forked start empty and load file on their own.
+        worker_tables = tables if sys.platform == 'win32' else None
+        self.pool = multiprocessing.Pool(processes, _init, (tuple(curves), worker_tables))
+
+    def imap_sign(self, name, jobs):
+        """(priv, value_hash) -> (s, r)"""
+        jobs = (
+            (name, priv.param_d, value_hash)
+            for priv, value_hash in jobs
+        )
+        return self.pool.imap(_sign, jobs, self.chunksize)
+
+    def imap_verify(self, name, jobs):
+        """(pubkey, value_hash, s, r) -> True or False"""
+        jobs = (
+            (name, _point(pubkey), value_hash, s, r)
+            for pubkey, value_hash, s, r in jobs
+        )
+        return self.pool.imap(_verify, jobs, self.chunksize)
+
+    def imap_agree(self, name, jobs, cofactor=True):
+        """(priv, pubkey) -> shared secret ZZ or None"""
+        jobs = (
+            (name, priv.param_d, _point(pubkey), cofactor)
+            for priv, pubkey in jobs
+        )
+        return self.pool.imap(_agree, jobs, self.chunksize)
+
+    def sign(self, name, jobs):
+        return list(self.imap_sign(name, jobs))
+
+    def verify(self, name, jobs):
+        return list(self.imap_verify(name, jobs))
+
+    def agree(self, name, jobs, cofactor=True):
+        return list(self.imap_agree(name, jobs, cofactor))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+def scaling(name, workers=(1, 2, 4), count=64):
+    """Measure sign and verify throughput (ops/s) for each pool size"""
+    import random
+    import time
+
+    rnd = random.Random(4145)
+    domain = StandardDomain.get(name)
+    priv = Priv(rnd.randint(1, domain.order - 1))
+    pub = domain.pub(priv)
+    hashes = [rnd.getrandbits(domain.param_m - 8) for _ in range(count)]
+
+    ret = []
+    for processes in workers:
+        with Pool(processes, curves=[name]) as pool:
+            pool.sign(name, [(priv, hashes[0])] * processes)
+            start = time.time()
+            sigs = pool.sign(name, [(priv, value_hash) for value_hash in hashes])
+            sign_time = time.time() - start
+
+            jobs = [
+                (pub, value_hash, s, r)
+                for value_hash, (s, r) in zip(hashes, sigs)
+            ]
+            start = time.time()
+            assert all(pool.verify(name, jobs))
+            verify_time = time.time() - start
+
+        ret.append((processes, count / sign_time, count / verify_time))
+
+    return ret
+
+
+def main(argv):
+    workers = [int(arg) for arg in argv] or [1, 2, 4, multiprocessing.cpu_count()]
+    workers = sorted(set(workers))
+    for name in CURVES:
+        for processes, sign_rate, verify_rate in scaling(name, workers):
+            print('%s workers=%d sign %.1f/s verify %.1f/s' % (
+                name, processes, sign_rate, verify_rate
+            ))
+
+
+if __name__ == '__main__':
+    import sys
+    main(sys.argv[1:])
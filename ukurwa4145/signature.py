@@ -0,0 +1,166 @@
+"""Binary encoding of DSTU 4145 signatures.
+
+Signature is octet string of r followed by s, both little-endian and
+of the same size, at least enough bytes to hold curve order. Documents
+and certificates carry it DER-wrapped into OCTET STRING, sometimes
+inside BIT STRING. decode() takes either form, encode() writes raw
+or OCTET STRING. Python integers are (s, r), same as Priv.sign().
+"""
+from .codec import int_from_bytes, int_to_bytes, _record, _records
+from .context import ldata
+
+
+TAG_BIT_STRING = 0x03
+TAG_OCTET_STRING = 0x04
+
+CHUNK_SIZE = 1 << 16
+
+
+def signature_size(domain):
+    """Size in bytes of raw r || s"""
+    return (long(domain.order).bit_length() + 7) // 8 * 2
+
+
+def _view(data):
+    if isinstance(data, (bytes, bytearray)):
+        return memoryview(data)
+
+    return data
+
+
+def der_length(size):
+    if size < 0x80:
+        return chr(size)
+
+    data = int_to_bytes(size, (size.bit_length() + 7) // 8)
+    return chr(0x80 | len(data)) + data
+
+
+def der_header(data, pos=0):
+    """(tag, content offset, content size) of DER value at pos"""
+    head = bytearray(data[pos:pos + 2])
+    if len(head) < 2:
+        raise ValueError("Truncated DER value")
+
+    tag, size = head
+    pos += 2
+    if size & 0x80:
+        count = size & 0x7F
+        raw = data[pos:pos + count]
+        if not count or count > 4 or len(raw) < count:
+            raise ValueError("Bad DER length")
+
+        size = int(int_from_bytes(_record(raw)))
+        pos += count
+
+    return tag, pos, size
+
+
+def encode(s, r, domain=None, der=False):
+    domain = domain or ldata.curve_domain
+    half = signature_size(domain) // 2
+    data = int_to_bytes(r, half, little=True) + int_to_bytes(s, half, little=True)
+    if der:
+        return chr(TAG_OCTET_STRING) + der_length(len(data)) + data
+
+    return data
+
+
+def decode(data, domain=None):
+    """Decode (s, r) from str, bytearray, memoryview or mmap slice.
+
+    Raw r || s is told from DER by its size, which is fixed by curve.
+    """
+    domain = domain or ldata.curve_domain
+    data = _view(data)
+    if len(data) == signature_size(domain):
+        return _split(data)
+
+    tag, pos, size = der_header(data)
+    if pos + size != len(data):
+        raise ValueError("Trailing data after signature")
+
+    if tag == TAG_BIT_STRING:
+        if bytearray(data[pos:pos + 1]) != bytearray(1):
+            raise ValueError("Signature BIT STRING has unused bits")
+
+        return decode(data[pos + 1:], domain)
+
+    if tag != TAG_OCTET_STRING:
+        raise ValueError("Unknown signature encoding")
+
+    return _split(data[pos:])
+
+
+def _split(data):
+    half = len(data) // 2
+    if not half or len(data) % 2:
+        raise ValueError("Signature halves differ in size")
+
+    r = int_from_bytes(_record(data[:half]), little=True)
+    s = int_from_bytes(_record(data[half:]), little=True)
+    return s, r
+
+
+def _der_values(source, chunk_size):
+    if not hasattr(source, 'read'):
+        source = _view(source)
+        pos = 0
+        while pos < len(source):
+            _, start, size = der_header(source, pos)
+            if start + size > len(source):
+                raise ValueError("Truncated DER value")
+
+            yield source[pos:start + size]
+            pos = start + size
+
+        return
+
+    buf = b''
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+
+        buf += chunk
+        view = memoryview(buf)
+        pos = 0
+        while len(buf) - pos >= 2:
+            try:
+                _, start, size = der_header(view, pos)
+            except ValueError:
+                if len(buf) - pos > 6:
+                    raise
+                break
+
+            if start + size > len(buf):
+                break
+
+            yield view[pos:start + size]
+            pos = start + size
+
+        buf = buf[pos:]
+
+    if buf:
+        raise ValueError("Truncated DER value")
+
+
+def parse_many(source, domain=None, der=True, chunk_size=CHUNK_SIZE):
+    """Decode stream of signatures, yielding (s, r) in order.
+
+    source is str, bytearray, memoryview or mmap, or file object to
+    read from in chunks. With der, it holds DER values back to back,
+    like SignerInfo signatures cut out of CMS archive, otherwise raw
+    r || s records of signature_size(). Any other iterable is taken
+    as separate encoded signatures.
+    """
+    domain = domain or ldata.curve_domain
+    if der and (hasattr(source, 'read') or hasattr(source, 'find') or
+                isinstance(source, (bytes, bytearray, memoryview))):
+        records = _der_values(source, chunk_size)
+    else:
+        size = signature_size(domain)
+        records = _records(source, size, max(1, chunk_size // size))
+
+    for record in records:
+        yield decode(record, domain)
@@ -0,0 +1,231 @@
+"""Precomputed curve tables stored in file and loaded through mmap.
+
+File is written once with dump() or
+
+    python -m ukurwa4145.tables FILE [CURVE ...]
+
+and load() installs its tables into StandardDomain classes, so
+base_table and base_wnaf are decoded in milliseconds instead of being
+built in hundreds of milliseconds. Tables are decoded into Python
+objects and the mapping is closed right away, so memory is shared
+only copy-on-write when file is loaded in master before forking
+workers. Workers that load it on their own hold a copy each.
+
+Layout, integers in header and index are little-endian:
+
+    header  magic, version, section count, sha256 of rest of file
+    index   (curve, kind, offset, count) for every section
+    data    field elements, (m + 7) / 8 bytes each, big-endian
+
+Every curve has trace mask, base table points, wNAF odd multiples
+of base point and digit tables of z^2 + z solver, curves that invert
+with Itoh-Tsujii also have digit tables of their multi-squarings.
+"""
+from binascii import hexlify
+import hashlib
+import mmap
+import os
+import struct
+
+from .codec import int_to_bytes
+from .context import StandardDomain
+from .math import Point, FixedBase, OddMultiples, HEX_DIGITS, ITOH_TABLE_MIN
+
+
+MAGIC = 'UKURWA\0T'
+VERSION = 1
+
+HEADER = struct.Struct('<8sHH32s')
+ENTRY = struct.Struct('<16s16sII')
+
+CURVES = ('DSTU_163', 'DSTU_257', 'DSTU_431')
+
+
+def _flat(tables):
+    return [table[digit] for table in tables for digit in HEX_DIGITS]
+
+
+def _digit_tables(values):
+    return [
+        dict(zip(HEX_DIGITS, values[pos:pos + 16]))
+        for pos in xrange(0, len(values), 16)
+    ]
+
+
+def _coords(points):
+    return [coord for point in points for coord in (point.xv, point.yv)]
+
+
+def _points(values, curve):
+    return [
+        Point.from_coords(x, y, curve)
+        for x, y in zip(values[::2], values[1::2])
+    ]
+
+
+def _sections(domain):
+    field = domain.field
+    yield 'trace_mask', [field.trace_mask]
+    yield 'base_table', _coords(
+        row[digit]
+        for row in domain.base_table.table
+        for digit in HEX_DIGITS[1:]
+    )
+    yield 'base_wnaf', _coords(domain.base_wnaf.table)
+    yield 'squad', _flat(field.squad_tables or field.comp_squad_tables())
+    if domain.FIELD_INV != 'itoh':
+        return
+
+    for step, count in field.inv_chain:
+        if step == 'double' and count >= ITOH_TABLE_MIN:
+            yield 'sqr%d' % count, _flat(field.multi_sqr_tables(count))
+
+
+def dump(path, names=CURVES):
+    """Build tables of named curves and write them to path"""
+    sections = []
+    for name in names:
+        domain = StandardDomain.get(name)
+        size = (domain.param_m + 7) // 8
+        for kind, values in _sections(domain):
+            data = ''.join(int_to_bytes(val, size) for val in values)
+            sections.append((name, kind, len(values), data))
+
+    offset = HEADER.size + ENTRY.size * len(sections)
+    index = []
+    for name, kind, count, data in sections:
+        index.append(ENTRY.pack(name, kind, offset, count))
+        offset += len(data)
+
+    body = ''.join(index) + ''.join(data for _, _, _, data in sections)
+    header = HEADER.pack(MAGIC, VERSION, len(sections), hashlib.sha256(body).digest())
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as fobj:
+        fobj.write(header)
+        fobj.write(body)
+
+    os.rename(tmp_path, path)
+
+
+def load(path, names=None):
+    """Validate table file and install its tables, return curve names.
+
+    Raises ValueError when file is damaged, written by other version
+    or does not match curve parameters. Nothing is installed then.
+    """
+    with open(path, 'rb') as fobj:
+        mapped = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return _load(mapped, names)
+    finally:
+        mapped.close()
+
+
+def _load(mapped, names):
+    if len(mapped) < HEADER.size:
+        raise ValueError("Table file is truncated")
+
+    magic, version, count, digest = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a table file")
+
+    if version != VERSION:
+        raise ValueError("Unsupported table file version {}".format(version))
+
+    if hashlib.sha256(mapped[HEADER.size:]).digest() != digest:
+        raise ValueError("Table file checksum mismatch")
+
+    if HEADER.size + ENTRY.size * count > len(mapped):
+        raise ValueError("Table file index is truncated")
+
+    sections = {}
+    for idx in xrange(count):
+        name, kind, offset, size = ENTRY.unpack_from(mapped, HEADER.size + ENTRY.size * idx)
+        sections.setdefault(name.rstrip('\0'), {})[kind.rstrip('\0')] = (offset, size)
+
+    names = list(names or sorted(sections))
+    tables = []
+    for name in names:
+        if name not in sections:
+            raise ValueError("Table file has no curve {}".format(name))
+
+        domain = StandardDomain.get(name)
+        tables.append((domain, _decode(domain, sections[name], mapped)))
+
+    for domain, attrs in tables:
+        for attr, val in attrs.items():
+            setattr(type(domain), attr, val)
+
+        # Shared instance is built already, new ones take
+        # field tables from class.
+        domain.field.squad_tables = attrs['_squad_tables']
+        domain.field.sqr_tables.update(attrs['_sqr_tables'])
+
+    return names
+
+
+def _decode(domain, sections, mapped):
+    cls = type(domain)
+    curve = domain.curve
+    hex_size = (domain.param_m + 7) // 8 * 2
+    # Digit tables of linear map on GF(2^m), 16 values per hex digit.
+    digit_count = (domain.param_m + 3) // 4 * 16
+
+    def values(kind):
+        if kind not in sections:
+            raise ValueError("Table file has no {} for {}".format(kind, cls.NAME))
+
+        offset, count = sections[kind]
+        if offset < HEADER.size or offset + count * hex_size // 2 > len(mapped):
+            raise ValueError("Table {} of {} is out of file".format(kind, cls.NAME))
+
+        raw = hexlify(mapped[offset:offset + count * hex_size // 2])
+        return [long(raw[pos:pos + hex_size], 16) for pos in xrange(0, len(raw), hex_size)]
+
+    if values('trace_mask') != [domain.field.trace_mask]:
+        raise ValueError("Table trace mask does not match {}".format(cls.NAME))
+
+    base = domain.base
+    bits = domain.order.bit_length()
+    points = _points(values('base_table'), curve)
+    if len(points) != (bits + 3) // 4 * 15 or points[0] != base or points[-1] not in curve:
+        raise ValueError("Base table does not match {}".format(cls.NAME))
+
+    wnaf = _points(values('base_wnaf'), curve)
+    if len(wnaf) != 1 << (cls.BASE_WNAF_WIDTH - 2) or wnaf[0] != base:
+        raise ValueError("wNAF table does not match {}".format(cls.NAME))
+
+    def digit_tables(kind):
+        ret = values(kind)
+        if len(ret) != digit_count:
+            raise ValueError("Table {} does not match {}".format(kind, cls.NAME))
+
+        return _digit_tables(ret)
+
+    rows = [points[pos:pos + 15] for pos in xrange(0, len(points), 15)]
+    sqr_tables = dict(
+        (int(kind[3:]), digit_tables(kind))
+        for kind in sections if kind.startswith('sqr')
+    )
+    return {
+        '_base_table': FixedBase.from_rows(base, bits, rows),
+        '_base_wnaf': OddMultiples.from_table(base, cls.BASE_WNAF_WIDTH, wnaf),
+        '_squad_tables': digit_tables('squad'),
+        '_sqr_tables': sqr_tables,
+    }
+
+
+def main(argv):
+    if not argv:
+        print('usage: python -m ukurwa4145.tables FILE [CURVE ...]')
+        return 1
+
+    dump(argv[0], argv[1:] or CURVES)
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main(sys.argv[1:]))